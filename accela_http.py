@@ -0,0 +1,230 @@
+"""
+HTTP-only client for Accela Citizen Access portals
+ACA search pages are ASP.NET WebForms: every search and every grid page
+is a form POST carrying the page's hidden state (__VIEWSTATE,
+__EVENTVALIDATION, ...) plus the __doPostBack event that a click would
+have fired. Replaying those postbacks with the shared HTTP session gets
+the same result pages a browser would, without starting Chrome.
+
+Each portal object has its own session: ACA keeps the search state in
+an ASP.NET server session (ASP.NET_SessionId), which must not leak into
+the client other scrapers share or be mixed between concurrent searches.
+
+Every grid page link in one pager block is posted from the same page
+state, so those pages are fetched concurrently. The next block ("...")
+is reached from the last page of the current one.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import lxml.html
+from http_client import PooledSession
+from scrapers.base_scraper import PermitScraper
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_TIMEOUT = 30
+
+# javascript:__doPostBack('target','argument')
+POSTBACK_PATTERN = re.compile(r"__doPostBack\('([^']*)',\s*'([^']*)'\)")
+
+# Suffixes of the general search form's control ids/names (the ctl00$... prefix varies by agency)
+START_DATE_FIELD = 'txtGSStartDate'
+END_DATE_FIELD = 'txtGSEndDate'
+SEARCH_BUTTON = 'btnNewSearch'
+RESULTS_GRID = 'gdvPermitList'
+# Shown instead of the grid when a search matches nothing
+NO_RESULTS_MARKERS = ('noDataMessage', 'ACA_Message_Notice')
+
+
+class AccelaError(Exception):
+    """An ACA page didn't have the form, button or grid a search needs"""
+
+
+def parse_postback(href):
+    """(event target, event argument) from a __doPostBack link, or None"""
+    match = POSTBACK_PATTERN.search(href or '')
+    return match.groups() if match else None
+
+
+class AccelaPortal:
+    """One ACA module (e.g. Fort Worth 'Development'), searched over plain HTTP"""
+
+    def __init__(self, base_url, module, session=None, max_workers=DEFAULT_MAX_WORKERS,
+                 timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.module = module
+        self.search_url = f"{self.base_url}/Cap/CapHome.aspx?module={module}&TabName={module}"
+        # Own pooled session - portal cookies must not reach the shared client
+        self.session = session or PooledSession()
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    # ==================== POSTBACKS ====================
+
+    @staticmethod
+    def _parse(response):
+        response.raise_for_status()
+        return lxml.html.fromstring(response.content, base_url=response.url)
+
+    @staticmethod
+    def _form(page):
+        form = page.get_element_by_id('aspnetForm', None)
+        if form is None and page.forms:
+            form = page.forms[0]
+        if form is None:
+            raise AccelaError("page has no WebForms form")
+        return form
+
+    def open_search(self):
+        """The module's search page"""
+        return self._parse(self.session.get(self.search_url, timeout=self.timeout))
+
+    def postback(self, page, target, argument='', **fields):
+        """
+        Fire one __doPostBack from a page and return the page the server answers with
+        The form's current values (hidden state included) are posted as a
+        browser would post them; fields override individual inputs.
+        """
+        form = self._form(page)
+        data = dict(form.form_values())
+        data.update(fields)
+        data['__EVENTTARGET'] = target
+        data['__EVENTARGUMENT'] = argument
+        response = self.session.post(form.action or self.search_url, data=data, timeout=self.timeout)
+        return self._parse(response)
+
+    @staticmethod
+    def _field_name(form, suffix):
+        for name in form.inputs.keys():
+            if name.endswith(suffix):
+                return name
+        return None
+
+    def search(self, start_date, end_date):
+        """First page of results for records opened between two dates"""
+        page = self.open_search()
+        form = self._form(page)
+
+        fields = {}
+        for suffix, date in ((START_DATE_FIELD, start_date), (END_DATE_FIELD, end_date)):
+            name = self._field_name(form, suffix)
+            if name:
+                fields[name] = date.strftime('%m/%d/%Y')
+
+        button = next((element for element in page.iter('a', 'input')
+                       if (element.get('id') or '').endswith(SEARCH_BUTTON)), None)
+        if button is None:
+            raise AccelaError(f"no search button on {self.search_url}")
+
+        event = parse_postback(button.get('href'))
+        if event:
+            return self.postback(page, *event, **fields)
+        # A real submit button posts its own name instead of an event target
+        fields[button.get('name')] = button.get('value', '')
+        return self.postback(page, '', **fields)
+
+    # ==================== RESULT GRID ====================
+
+    @staticmethod
+    def _grid(page):
+        return next((table for table in page.iter('table') if RESULTS_GRID in (table.get('id') or '')), None)
+
+    @classmethod
+    def result_rows(cls, page):
+        """Row dicts from a results page (permit_number, address, permit_type, issue_date, status, ...)"""
+        grid = cls._grid(page)
+        if grid is None:
+            return []
+
+        rows = []
+        columns = None
+        status_index = None
+        # Direct rows only - the pager row nests its own table
+        for row in grid.xpath('./tr | ./tbody/tr'):
+            if row.xpath('.//table'):
+                continue
+            cells = [' '.join(cell.text_content().split()) for cell in row if cell.tag in ('td', 'th')]
+            if columns is None:
+                columns = PermitScraper.map_columns(cells)
+                status_index = next((i for i, header in enumerate(cells) if header.lower() == 'status'), None)
+                continue
+            if not any(cells):
+                continue
+
+            record = {field: PermitScraper.cell_text(cells, columns, field) for field in columns}
+            if status_index is not None and status_index < len(cells):
+                record['status'] = cells[status_index]
+            if record.get('permit_number'):
+                rows.append(record)
+
+        return rows
+
+    @classmethod
+    def pager_links(cls, page):
+        """[(label, target, argument)] for the grid's pager, in page order"""
+        grid = cls._grid(page)
+        if grid is None:
+            return []
+        links = []
+        for link in grid.iter('a'):
+            event = parse_postback(link.get('href'))
+            if event:
+                links.append((' '.join(link.text_content().split()), *event))
+        return links
+
+    @staticmethod
+    def _next_block(links):
+        """The '...' / 'Next' link after this block's page numbers, if any"""
+        numbered = [index for index, (label, _, _) in enumerate(links) if label.isdigit()]
+        after = numbered[-1] + 1 if numbered else 0
+        for label, target, argument in links[after:]:
+            if label == '...' or label.lower().startswith('next'):
+                return target, argument
+        return None
+
+    def search_results(self, start_date, end_date, max_pages=None):
+        """
+        Every result row for a date range, in grid order
+        Pages of one pager block are posted concurrently from the same state.
+        """
+        current = self.search(start_date, end_date)
+        if self._grid(current) is None:
+            if any(marker in (element.get('id') or '') + (element.get('class') or '')
+                   for element in current.iter('div', 'span') for marker in NO_RESULTS_MARKERS):
+                return []
+            raise AccelaError(f"search on {self.search_url} returned neither results nor a no-results notice")
+        rows = self.result_rows(current)
+        fetched = 1
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while max_pages is None or fetched < max_pages:
+                links = self.pager_links(current)
+                pending = [(int(label), target, argument) for label, target, argument in links
+                           if label.isdigit() and int(label) > fetched]
+                if max_pages is not None:
+                    pending = [link for link in pending if link[0] <= max_pages]
+
+                pages = list(pool.map(lambda link: self.postback(current, link[1], link[2]), pending))
+                for page in pages:
+                    rows.extend(self.result_rows(page))
+                if pending:
+                    fetched = pending[-1][0]
+                    current = pages[-1]
+
+                next_block = self._next_block(self.pager_links(current))
+                if next_block is None or (max_pages is not None and fetched >= max_pages):
+                    break
+                current = self.postback(current, *next_block)
+                rows.extend(self.result_rows(current))
+                fetched += 1
+
+        print(f"   📄 {self.module}: {len(rows)} records from {fetched} result pages")
+        return rows
+
+
+def search_recent(base_url, module, days=30, session=None, max_pages=None):
+    """Result rows for records opened in the last `days` days"""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    portal = AccelaPortal(base_url, module, session=session)
+    return portal.search_results(start_date, end_date, max_pages=max_pages)
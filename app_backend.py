@@ -9,6 +9,7 @@ import hmac
 import hashlib
 import database
 import auth
+from lead_store import lead_store
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production-' + os.urandom(24).hex())
@@ -28,19 +29,18 @@ STRIPE_URLS = {
     }
 }
 
-def load_leads():
-    db_path = '/Users/briceleasure/Desktop/contractor-leads-saas/leads_db/current_leads.json'
-    if os.path.exists(db_path):
-        with open(db_path, 'r') as f:
-            data = json.load(f)
-            leads_data = data.get('leads', {})
-            for state in leads_data.values():
-                for county_leads in state.values():
-                    for lead in county_leads:
-                        if lead.get('score') == 90:
-                            lead['score'] = random.randint(75, 98)
-            return leads_data
-    return {}
+# Placeholder scores (90) get one random score per lead for the life of the
+# process, as when every lead was loaded once at startup
+_display_scores = {}
+
+def load_leads(state, county):
+    """One county's leads from the lead store (indexed lookup, not the whole database)"""
+    leads = lead_store.query(state=state, county=county)
+    for lead in leads:
+        if lead.get('score') == 90:
+            key = (state, county, lead.get('permit_number'))
+            lead['score'] = _display_scores.setdefault(key, random.randint(75, 98))
+    return leads
 
 def blur_address(address):
     suffixes = ['Street', 'St', 'Avenue', 'Ave', 'Road', 'Rd', 'Drive', 'Dr', 'Lane', 'Ln', 
@@ -71,8 +71,6 @@ def blur_address(address):
         else:
             return f'<span class="blur">[Address Locked]</span>'
 
-LEADS = load_leads()
-
 # Initialize database on startup
 with app.app_context():
     database.init_database()
@@ -417,7 +415,7 @@ def county_detail(state, county):
         has_access = database.has_access_to_county(user['id'], state, county)
     
     # Get leads for this county
-    leads = LEADS.get(state, {}).get(county, [])
+    leads = load_leads(state, county)
     
     if not leads:
         return "<h1>No leads found</h1>", 404
@@ -591,7 +589,7 @@ def dashboard():
     </body></html>"""
 
 if __name__ == '__main__':
-    total_leads = sum(len(county_leads) for state_leads in LEADS.values() for county_leads in state_leads.values())
+    total_leads = lead_store.count()
     print(f"\n🚀 Contractor Leads Backend")
     print(f"📊 {total_leads:,} leads loaded")
     print(f"🔐 Authentication enabled")
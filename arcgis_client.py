@@ -0,0 +1,113 @@
+"""
+ArcGIS FeatureServer/MapServer layer client
+Gets past the layer's maxRecordCount (1000 on Nashville's BuildingPermits):
+first asks for every matching object id (returnIdsOnly has no cap), then
+fetches the features in objectIds chunks in parallel. No resultOffset
+paging, which some MapServer layers reject with a 400.
+"""
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http_client import get_session
+from arcgis_pbf import decode_feature_collection
+
+# ~8 characters per id keeps a 200-id chunk well under IIS's 2048-char query limit
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_MAX_WORKERS = 4
+
+# layer url -> whether its query endpoint speaks f=pbf (checked once per process)
+_pbf_support = {}
+_pbf_support_lock = threading.Lock()
+
+
+class ArcGISError(Exception):
+    """Error payload returned by an ArcGIS REST endpoint (often with HTTP 200)"""
+
+
+class ArcGISLayer:
+    """One queryable ArcGIS layer, e.g. .../MapServer/0"""
+
+    def __init__(self, layer_url, session=None, timeout=30, use_pbf=True):
+        self.layer_url = layer_url.rstrip('/')
+        self.query_url = f"{self.layer_url}/query"
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.use_pbf = use_pbf
+
+    def query(self, **params):
+        """Run a raw query and return the decoded JSON"""
+        params.setdefault('f', 'json')
+        response = self.session.get(self.query_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if 'error' in data:
+            raise ArcGISError(f"{self.layer_url}: {data['error'].get('message', data['error'])}")
+        return data
+
+    def supports_pbf(self):
+        """Whether the layer lists PBF in supportedQueryFormats"""
+        with _pbf_support_lock:
+            if self.layer_url not in _pbf_support:
+                try:
+                    response = self.session.get(self.layer_url, params={'f': 'json'}, timeout=self.timeout)
+                    formats = response.json().get('supportedQueryFormats', '')
+                except Exception:
+                    formats = ''
+                _pbf_support[self.layer_url] = 'PBF' in formats.upper()
+            return _pbf_support[self.layer_url]
+
+    def query_features(self, where='1=1', out_fields='*', **params):
+        """
+        Attribute dicts for matching features
+        out_fields: list of field names (pushed down so the server only sends those)
+        Uses the compact f=pbf encoding when the layer supports it.
+        """
+        if not isinstance(out_fields, str):
+            out_fields = ','.join(out_fields)
+        params.update(where=where, outFields=out_fields, returnGeometry='false')
+
+        if self.use_pbf and self.supports_pbf():
+            response = self.session.get(self.query_url, params=dict(params, f='pbf'), timeout=self.timeout)
+            if response.status_code >= 500:
+                response.raise_for_status()
+            # A layer that can't answer this query in pbf replies with a JSON error
+            if response.ok and 'json' not in response.headers.get('Content-Type', ''):
+                try:
+                    return decode_feature_collection(response.content)['features']
+                except (ValueError, IndexError, struct.error) as e:
+                    print(f"   ⚠️  PBF decode failed for {self.layer_url} ({e}), using JSON")
+            with _pbf_support_lock:
+                _pbf_support[self.layer_url] = False
+
+        data = self.query(**params)
+        return [feature.get('attributes', {}) for feature in data.get('features', [])]
+
+    def query_ids(self, where='1=1'):
+        """All object ids matching a where clause, ascending"""
+        data = self.query(where=where, returnIdsOnly='true')
+        return sorted(data.get('objectIds') or [])
+
+    def fetch_chunk(self, object_ids, out_fields='*'):
+        """Attribute dicts for one chunk of object ids"""
+        return self.query_features(
+            out_fields=out_fields,
+            objectIds=','.join(str(object_id) for object_id in object_ids)
+        )
+
+    def iter_features(self, where='1=1', out_fields='*', chunk_size=DEFAULT_CHUNK_SIZE,
+                      max_workers=DEFAULT_MAX_WORKERS, max_records=None):
+        """
+        Yield the attributes of every feature matching where
+        Chunks are fetched in parallel but yielded in object id order.
+        max_records keeps only the highest (usually newest) object ids.
+        """
+        object_ids = self.query_ids(where)
+        if max_records is not None:
+            object_ids = object_ids[-max_records:]
+        if not object_ids:
+            return
+
+        chunks = [object_ids[i:i + chunk_size] for i in range(0, len(object_ids), chunk_size)]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            for attributes in pool.map(lambda chunk: self.fetch_chunk(chunk, out_fields), chunks):
+                yield from attributes
@@ -0,0 +1,120 @@
+"""
+Decoder for ArcGIS query responses in f=pbf (Esri FeatureCollection protobuf)
+Only what the scrapers need: field names, attribute values and the
+exceededTransferLimit flag. Geometry is skipped (we query with
+returnGeometry=false). Pure Python, so no protobuf dependency.
+
+Message layout (FeatureCollection.proto):
+  FeatureCollectionPBuffer { queryResult = 2 }
+  QueryResult   { featureResult = 1 }
+  FeatureResult { objectIdFieldName = 1, exceededTransferLimit = 9,
+                  fields = 13 (repeated), features = 15 (repeated) }
+  Field         { name = 1 }
+  Feature       { attributes = 1 (repeated Value) }
+  Value         { string 1 | float 2 | double 3 | sint32 4 | uint32 5 |
+                  int64 6 | uint64 7 | sint64 8 | bool 9 }
+"""
+import struct
+
+# Wire types
+VARINT, FIXED64, LENGTH_DELIMITED, FIXED32 = 0, 1, 2, 5
+
+
+def _read_varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buf):
+    """Yield (field_number, wire_type, value) for one message"""
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        field_number, wire_type = key >> 3, key & 0x07
+        if wire_type == VARINT:
+            value, pos = _read_varint(buf, pos)
+        elif wire_type == FIXED64:
+            value, pos = buf[pos:pos + 8], pos + 8
+        elif wire_type == LENGTH_DELIMITED:
+            length, pos = _read_varint(buf, pos)
+            value, pos = buf[pos:pos + length], pos + length
+        elif wire_type == FIXED32:
+            value, pos = buf[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        yield field_number, wire_type, value
+
+
+def _zigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def _signed64(value):
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _decode_value(buf):
+    """One Value message -> Python value (None when no field is set)"""
+    for field_number, wire_type, value in _iter_fields(buf):
+        if field_number == 1:
+            return bytes(value).decode('utf-8')
+        elif field_number == 2:
+            return struct.unpack('<f', value)[0]
+        elif field_number == 3:
+            return struct.unpack('<d', value)[0]
+        elif field_number in (4, 8):
+            return _zigzag(value)
+        elif field_number in (5, 7):
+            return value
+        elif field_number == 6:
+            return _signed64(value)
+        elif field_number == 9:
+            return bool(value)
+    return None
+
+
+def _find(buf, wanted):
+    for field_number, wire_type, value in _iter_fields(buf):
+        if field_number == wanted:
+            return value
+    return None
+
+
+def decode_feature_collection(content):
+    """
+    Decode a pbf query response
+    Returns {'fields': [...], 'features': [attribute dicts], 'exceededTransferLimit': bool}
+    """
+    buf = memoryview(content)
+    query_result = _find(buf, 2)
+    feature_result = _find(query_result, 1) if query_result is not None else None
+    if feature_result is None:
+        raise ValueError("PBF response has no featureResult")
+
+    field_names = []
+    features = []
+    exceeded = False
+
+    for field_number, wire_type, value in _iter_fields(feature_result):
+        if field_number == 9:
+            exceeded = bool(value)
+        elif field_number == 13:
+            field_names.append(bytes(_find(value, 1) or b'').decode('utf-8'))
+        elif field_number == 15:
+            # Attribute values are positional, in the same order as fields
+            values = [_decode_value(attr) for number, _, attr in _iter_fields(value) if number == 1]
+            features.append(dict(zip(field_names, values)))
+
+    return {
+        'fields': field_names,
+        'features': features,
+        'exceededTransferLimit': exceeded
+    }
@@ -0,0 +1,188 @@
+"""
+Shared headless Chrome pool for Selenium-based sources
+Starting Chrome (and resolving its driver) is most of the cost of a
+browser scrape, so drivers are started once and reused across searches.
+Pages are loaded without images, fonts or third-party trackers, and
+callers wait on explicit conditions instead of fixed sleeps.
+"""
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from http_client import USER_AGENT
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_WAIT = 20          # seconds an explicit wait may take
+MAX_USES = 50              # searches before a driver is recycled (Chrome's memory only grows)
+
+# Matched by Chrome against every request URL (CDP Network.setBlockedURLs wildcards)
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*fonts.googleapis.com*', '*fonts.gstatic.com*', '*facebook.net*',
+    '*hotjar.com*', '*newrelic.com*', '*nr-data.net*', '*youtube.com*'
+]
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def get_driver_path():
+    """Resolve chromedriver once per process (webdriver_manager hits the network)"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            try:
+                from webdriver_manager.chrome import ChromeDriverManager
+                _driver_path = ChromeDriverManager().install()
+            except Exception as e:
+                # Selenium >= 4.6 finds a driver itself
+                print(f"   ⚠️  webdriver_manager unavailable ({e}), letting Selenium locate chromedriver")
+                _driver_path = ''
+        return _driver_path
+
+
+def chrome_options(headless=True):
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    # Don't even decode images; fonts and trackers are blocked per request below
+    options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    # Return from get() at DOMContentLoaded - explicit waits cover the rest
+    options.page_load_strategy = 'eager'
+    return options
+
+
+def start_driver(headless=True):
+    """A new Chrome with heavy and third-party resources blocked"""
+    driver_path = get_driver_path()
+    service = Service(driver_path) if driver_path else Service()
+    driver = webdriver.Chrome(service=service, options=chrome_options(headless))
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    return driver
+
+
+# ==================== EXPLICIT WAITS ====================
+
+def wait_for(driver, condition, timeout=DEFAULT_WAIT):
+    """WebDriverWait(...).until(condition), returning None instead of raising on timeout"""
+    try:
+        return WebDriverWait(driver, timeout).until(condition)
+    except TimeoutException:
+        return None
+
+
+def wait_for_any(driver, selectors, timeout=DEFAULT_WAIT):
+    """First element matching any of the CSS selectors, as (selector, element) or (None, None)"""
+    def first_match(driver):
+        for selector in selectors:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                return selector, elements[0]
+        return False
+
+    return wait_for(driver, first_match, timeout) or (None, None)
+
+
+# ==================== POOL ====================
+
+class BrowserPool:
+    """Up to `size` Chrome drivers, started on demand and reused between searches"""
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, headless=True, max_uses=MAX_USES):
+        self.size = size
+        self.headless = headless
+        self.max_uses = max_uses
+        self._idle = []
+        self._uses = {}
+        self._started = 0  # drivers alive or starting - idle and borrowed
+        # Signalled whenever a driver goes back to the pool or a slot frees up
+        self._available = threading.Condition()
+
+    def _checkout(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            while not self._idle and self._started >= self.size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"no browser free after {timeout}s")
+                self._available.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+
+        # Started outside the lock - Chrome takes seconds to come up
+        try:
+            driver = start_driver(self.headless)
+        except Exception:
+            with self._available:
+                self._started -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _checkin(self, driver, healthy):
+        with self._available:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            if healthy and self._uses[id(driver)] < self.max_uses:
+                self._idle.append(driver)
+                self._available.notify()
+                return
+        self._discard(driver)
+
+    def _discard(self, driver):
+        # Frees the slot for a waiter before the (slow) quit
+        with self._available:
+            self._started -= 1
+            self._uses.pop(id(driver), None)
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        Borrow a driver for one search
+        A driver that crashed or has served max_uses searches is quit
+        instead of going back to the pool. Raises TimeoutError when no
+        driver is free within timeout seconds.
+        """
+        driver = self._checkout(timeout)
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self._checkin(driver, healthy)
+
+    def close(self):
+        """Quit every idle driver"""
+        with self._available:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+
+# Shared by every Selenium source in the process
+browser_pool = BrowserPool()
+atexit.register(browser_pool.close)
@@ -4,22 +4,18 @@ Email Sender - Sends daily contractor leads to subscribers
 Run this daily via cron job at 6 AM
 """
 
-import json
 import os
 from datetime import datetime
 import database
+from lead_store import lead_store
 
 # Email configuration - set these environment variables
 SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY', '')
 FROM_EMAIL = os.environ.get('FROM_EMAIL', 'leads@contractorleads.com')
 
-def load_leads():
-    """Load leads from database"""
-    db_path = '/Users/briceleasure/Desktop/contractor-leads-saas/leads_db/current_leads.json'
-    if os.path.exists(db_path):
-        with open(db_path, 'r') as f:
-            return json.load(f).get('leads', {})
-    return {}
+def load_leads(state_key, county_key):
+    """Load one county's leads from the lead store"""
+    return lead_store.query(state=state_key, county=county_key)
 
 def format_leads_html(leads, max_leads=50):
     """Format leads as HTML for email"""
@@ -111,9 +107,6 @@ def send_daily_leads():
     else:
         use_sendgrid = True
     
-    # Load all leads
-    all_leads = load_leads()
-    
     # Get all active subscriptions
     with database.get_db() as conn:
         cursor = conn.execute("""
@@ -140,7 +133,7 @@ def send_daily_leads():
         name = sub['full_name'] or 'Subscriber'
         
         # Get leads for this county
-        county_leads = all_leads.get(state_key, {}).get(county_key, [])
+        county_leads = load_leads(state_key, county_key)
         
         if not county_leads:
             print(f"⚠️  No leads for {county_key}, {state_key} - skipping {email}")
@@ -0,0 +1,98 @@
+"""
+Concurrent fetch engine for multi-source scraping
+Runs every source adapter at once, caps concurrency per upstream host
+and stops waiting when the run deadline is reached
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Defaults sized for 4x-daily runs: every adapter in flight at once,
+# but never more than a few requests against the same city portal
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_HOST_LIMIT = 4
+DEFAULT_DEADLINE = 90  # seconds for the whole run
+
+
+class FetchJob:
+    """One source adapter call scheduled on the engine"""
+
+    def __init__(self, name, func, args=(), kwargs=None, host=None):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.host = host  # None = no per-host cap (demo/offline sources)
+        self.elapsed = None
+
+    def __repr__(self):
+        return f"FetchJob({self.name!r}, host={self.host!r})"
+
+
+class FetchEngine:
+    """Runs fetch jobs in a thread pool and yields results as they finish"""
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, host_limits=None,
+                 default_host_limit=DEFAULT_HOST_LIMIT, deadline=DEFAULT_DEADLINE):
+        self.max_workers = max_workers
+        self.host_limits = host_limits or {}
+        self.default_host_limit = default_host_limit
+        self.deadline = deadline
+        self._host_semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host):
+        """Get (or create) the concurrency cap for a host"""
+        with self._lock:
+            if host not in self._host_semaphores:
+                limit = self.host_limits.get(host, self.default_host_limit)
+                self._host_semaphores[host] = threading.BoundedSemaphore(limit)
+            return self._host_semaphores[host]
+
+    def _run_job(self, job):
+        """Execute a single job, holding its host slot while it runs"""
+        started = time.monotonic()
+        try:
+            if job.host is None:
+                return job.func(*job.args, **job.kwargs)
+            with self._semaphore(job.host):
+                return job.func(*job.args, **job.kwargs)
+        finally:
+            job.elapsed = time.monotonic() - started
+
+    def run(self, jobs):
+        """
+        Run all jobs concurrently
+        Yields (job, result, error) tuples in completion order.
+        Jobs still running at the deadline are abandoned and reported.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs)))
+        futures = {executor.submit(self._run_job, job): job for job in jobs}
+        pending = set(futures)
+        started = time.monotonic()
+
+        try:
+            while pending:
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = futures[future]
+                    try:
+                        yield job, future.result(), None
+                    except Exception as e:
+                        yield job, None, e
+        finally:
+            # Also reached when the caller stops iterating early - that's not a timeout
+            if pending and time.monotonic() - started >= self.deadline:
+                names = ', '.join(futures[f].name for f in pending)
+                print(f"   ⏱️  Deadline of {self.deadline}s reached, abandoning: {names}")
+            # Don't block the run on abandoned sources - their threads
+            # finish in the background and the results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,166 +1,150 @@
 """
 Fort Worth Accela Selenium Scraper
 Scrapes building permits from Fort Worth's Accela Citizen Access portal
+Tries the HTTP-only postback replay first; Chrome is only started when
+that can't get through (e.g. the portal starts requiring JavaScript).
 """
 
-from selenium import webdriver
+import lxml.html
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from datetime import datetime, timedelta
-import time
-import json
+from browser_pool import browser_pool, wait_for, wait_for_any
+from accela_http import AccelaPortal
 
-def setup_driver():
-    """Setup Chrome driver with headless options"""
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # Run in background
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
+AGENCY_URL = "https://aca-prod.accela.com/CFW"
+MODULE = "Development"
+SEARCH_URL = f"{AGENCY_URL}/Cap/CapHome.aspx?module={MODULE}&TabName={MODULE}"
+
+SEARCH_BUTTON_SELECTOR = "input[type='submit'][value*='Search'], a[id*='Search']"
+
+# Common table selectors in Accela
+RESULTS_TABLE_SELECTORS = [
+    "table[id*='gdvPermitList']",
+    "table[class*='ACA_GridView']",
+    "table[class*='result']",
+    "div[id*='divResultsTable'] table"
+]
+# Shown instead of the grid when a search matches nothing
+NO_RESULTS_SELECTORS = ["[id*='noDataMessage']", "div[class*='ACA_Message_Notice']"]
+
+
+def parse_results_table(table_html):
+    """Permit dicts from the results grid's HTML (one WebDriver call instead of one per cell)"""
+    permits = []
+    table = lxml.html.fromstring(table_html)
+    
+    for i, row in enumerate(table.iter('tr')):
+        if i == 0:  # Skip header row
+            continue
+        cells = [cell.text_content().strip() for cell in row.findall('td')]
+        if len(cells) < 3:
+            continue
+        permits.append({
+            'permit_number': cells[0] or 'N/A',
+            'address': cells[1] or 'N/A',
+            'permit_type': cells[2] or 'Building',
+            'date': cells[3] if len(cells) > 3 else datetime.now().strftime('%Y-%m-%d'),
+            'status': cells[4] if len(cells) > 4 else 'Active',
+            'work_description': 'Scraped from Accela portal',
+            'estimated_value': 0,
+            'score': 85,
+            'source': 'Fort Worth Accela (Selenium)'
+        })
+    
+    return permits
+
+
+def scrape_fortworth_http(days=30):
+    """Fort Worth permits via replayed ASP.NET postbacks (None if the portal didn't cooperate)"""
+    print("\n⚡ Trying HTTP-only Accela search...")
+    try:
+        end_date = datetime.now()
+        rows = AccelaPortal(AGENCY_URL, MODULE).search_results(end_date - timedelta(days=days), end_date)
+    except Exception as e:
+        print(f"   ⚠️  HTTP search failed ({e}), falling back to the browser")
+        return None
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    return driver
+    return [{
+        'permit_number': row['permit_number'],
+        'address': row.get('address') or 'N/A',
+        'permit_type': row.get('permit_type') or 'Building',
+        'date': row.get('issue_date') or datetime.now().strftime('%Y-%m-%d'),
+        'status': row.get('status') or 'Active',
+        'work_description': row.get('work_description') or 'Scraped from Accela portal',
+        'estimated_value': 0,
+        'score': 85,
+        'source': 'Fort Worth Accela'
+    } for row in rows]
 
-def scrape_fortworth_accela():
+
+def scrape_fortworth_accela(pool=browser_pool, use_http=True):
     """Scrape Fort Worth building permits from Accela"""
     print("\n" + "="*70)
-    print("🕷️  Starting Fort Worth Accela Selenium Scraper")
+    print("🕷️  Starting Fort Worth Accela Scraper")
     print("="*70)
     
-    driver = None
+    permits = scrape_fortworth_http() if use_http else None
+    if permits is not None:
+        print("\n" + "="*70)
+        print(f"✅ Scraping complete! Found {len(permits)} permits")
+        print("="*70)
+        return permits
+    
     permits = []
     
     try:
-        # Setup driver
-        print("\n1️⃣  Setting up Chrome driver...")
-        driver = setup_driver()
-        
-        # Navigate directly to Development permit search page
-        print("2️⃣  Navigating to Fort Worth Development permit search...")
-        url = "https://aca-prod.accela.com/CFW/Cap/CapHome.aspx?module=Development&TabName=Development"
-        driver.get(url)
-        
-        # Wait for page to load
-        print("3️⃣  Waiting for search page to load...")
-        time.sleep(5)
-        
-        # Try to find and interact with search form
-        print("4️⃣  Looking for permit search form...")
-        
-        # Save page source for debugging
-        with open('/tmp/fortworth_search_page.html', 'w') as f:
-            f.write(driver.page_source)
-        print("   💾 Page source saved to /tmp/fortworth_search_page.html")
-        
-        # Common Accela search field IDs/names
-        search_fields = [
-            "ctl00$PlaceHolderMain$generalSearchForm$txtGSPermitNumber",
-            "ctl00$PlaceHolderMain$generalSearchForm$txtGSStreetName",
-            "txtGSPermitNumber",
-            "txtGSStreetName"
-        ]
-        
-        # Try to find date range or recent permits option
-        print("7️⃣  Attempting to set date range...")
-        
-        # Calculate date range (last 30 days)
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
-        
-        # Try to find date fields
-        date_fields = driver.find_elements(By.CSS_SELECTOR, "input[type='text'][id*='Date']")
-        print(f"   Found {len(date_fields)} date fields")
-        
-        # Look for search button
-        print("8️⃣  Looking for search button...")
-        search_buttons = driver.find_elements(By.CSS_SELECTOR, "input[type='submit'][value*='Search'], a[id*='Search']")
-        print(f"   Found {len(search_buttons)} search buttons")
-        
-        if search_buttons:
-            print("9️⃣  Clicking search to get recent permits...")
-            try:
-                search_buttons[0].click()
-                time.sleep(5)
-            except Exception as e:
-                print(f"   ⚠️  Could not click button: {e}")
-        
-        # Wait for results
-        print("🔟 Waiting for results...")
-        time.sleep(5)
-        
-        # Try to find results table
-        print("📋 Looking for permit results table...")
-        
-        # Common table selectors in Accela
-        table_selectors = [
-            "table[id*='gdvPermitList']",
-            "table[class*='ACA_GridView']",
-            "table[class*='result']",
-            "div[id*='divResultsTable'] table"
-        ]
-        
-        results_table = None
-        for selector in table_selectors:
-            tables = driver.find_elements(By.CSS_SELECTOR, selector)
-            if tables:
-                results_table = tables[0]
-                print(f"   ✅ Found results table with selector: {selector}")
-                break
-        
-        if results_table:
-            # Parse table rows
-            rows = results_table.find_elements(By.TAG_NAME, "tr")
-            print(f"   📊 Found {len(rows)} rows in results table")
+        # Reuses a running Chrome when the pool has one
+        print("\n1️⃣  Getting a browser from the pool...")
+        with pool.acquire() as driver:
+            # Navigate directly to Development permit search page
+            print("2️⃣  Navigating to Fort Worth Development permit search...")
+            driver.get(SEARCH_URL)
+            
+            print("3️⃣  Waiting for search form...")
+            search_button = wait_for(driver, EC.element_to_be_clickable((By.CSS_SELECTOR, SEARCH_BUTTON_SELECTOR)))
+            
+            # Try to find date range or recent permits option
+            print("4️⃣  Attempting to set date range...")
+            
+            # Calculate date range (last 30 days)
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=30)
             
-            for i, row in enumerate(rows[1:]):  # Skip header row
+            # Try to find date fields
+            date_fields = driver.find_elements(By.CSS_SELECTOR, "input[type='text'][id*='Date']")
+            print(f"   Found {len(date_fields)} date fields")
+            
+            if search_button is not None:
+                print("5️⃣  Clicking search to get recent permits...")
                 try:
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) >= 3:
-                        permit = {
-                            'permit_number': cells[0].text.strip() if len(cells) > 0 else 'N/A',
-                            'address': cells[1].text.strip() if len(cells) > 1 else 'N/A',
-                            'permit_type': cells[2].text.strip() if len(cells) > 2 else 'Building',
-                            'date': cells[3].text.strip() if len(cells) > 3 else datetime.now().strftime('%Y-%m-%d'),
-                            'status': cells[4].text.strip() if len(cells) > 4 else 'Active',
-                            'work_description': 'Scraped from Accela portal',
-                            'estimated_value': 0,
-                            'score': 85,
-                            'source': 'Fort Worth Accela (Selenium)'
-                        }
-                        permits.append(permit)
-                        
-                        if i < 5:  # Show first 5
-                            print(f"   ✅ {permit['permit_number']} - {permit['address']}")
+                    search_button.click()
+                    # The postback replaces the form - wait for the old button to go stale
+                    wait_for(driver, EC.staleness_of(search_button))
                 except Exception as e:
-                    print(f"   ⚠️  Error parsing row {i}: {e}")
-                    continue
-        else:
-            print("   ❌ Could not find results table")
-            print("   📸 Taking screenshot for debugging...")
-            driver.save_screenshot("/tmp/fortworth_no_results.png")
-            print("   💾 Screenshot saved to /tmp/fortworth_no_results.png")
+                    print(f"   ⚠️  Could not click button: {e}")
+            else:
+                print("   ⚠️  Search button never appeared")
+            
+            # Wait for the grid (or the portal's "no results" notice)
+            print("6️⃣  Waiting for results...")
+            selector, element = wait_for_any(driver, RESULTS_TABLE_SELECTORS + NO_RESULTS_SELECTORS)
             
-            # Print page source snippet for debugging
-            print("\n   🔍 Page source snippet:")
-            print(driver.page_source[:500])
+            if selector in RESULTS_TABLE_SELECTORS:
+                print(f"   ✅ Found results table with selector: {selector}")
+                permits = parse_results_table(element.get_attribute('outerHTML'))
+                print(f"   📊 Parsed {len(permits)} permits from results table")
+                
+                for permit in permits[:5]:  # Show first 5
+                    print(f"   ✅ {permit['permit_number']} - {permit['address']}")
+            elif selector is not None:
+                print("   ℹ️  Search returned no permits")
+            else:
+                print("   ❌ Could not find results table")
+                print(f"   🔍 Page title: {driver.title!r}, url: {driver.current_url}")
         
     except Exception as e:
         print(f"\n❌ Error during scraping: {e}")
-        if driver:
-            driver.save_screenshot("/tmp/fortworth_error.png")
-            print("📸 Screenshot saved to /tmp/fortworth_error.png")
-    
-    finally:
-        if driver:
-            print("\n🔄 Closing browser...")
-            driver.quit()
     
     print("\n" + "="*70)
     print(f"✅ Scraping complete! Found {len(permits)} permits")
@@ -184,6 +168,6 @@ if __name__ == '__main__':
         print("  2. Login credentials")
         print("  3. Different search approach")
         print("\n💡 Next steps:")
-        print("  • Check screenshots in /tmp/")
+        print("  • Run with a visible browser: BrowserPool(headless=False)")
         print("  • Try manual search on portal to see required fields")
         print("  • Consider requesting bulk data from city")
@@ -0,0 +1,93 @@
+"""
+On-disk HTTP validator cache for bulk downloads
+Stores ETag / Last-Modified per URL and sends If-None-Match /
+If-Modified-Since on the next run. When the city hasn't republished
+the file, the server answers 304 and the scraper reuses the results it
+parsed last time instead of downloading and parsing again.
+
+Entries are keyed by (namespace, URL): scrapers that download the same
+file but filter and shape it differently each keep their own validators
+and payload, so a 304 never hands one scraper another's results.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from http_client import get_session
+
+CACHE_DIR = Path(__file__).parent / 'http_cache'
+
+
+class ValidatorCache:
+    """ETag / Last-Modified store keyed by consumer namespace + URL"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, url, namespace):
+        return self.cache_dir / f"{hashlib.sha1(f'{namespace}|{url}'.encode()).hexdigest()}.json"
+
+    def load(self, url, namespace):
+        """Cached entry for a URL in a namespace, or None"""
+        try:
+            with open(self._path(url, namespace), 'r') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry if entry.get('namespace') == namespace else None
+
+    def conditional_headers(self, url, namespace):
+        """Validator headers for the next request to this URL"""
+        entry = self.load(url, namespace)
+        headers = {}
+        if entry and entry.get('payload') is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def get(self, url, namespace, session=None, headers=None, **kwargs):
+        """GET a URL with this namespace's validators attached (check not_modified() on the result)"""
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(url, namespace))
+        session = session or get_session()
+        return session.get(url, headers=request_headers, **kwargs)
+
+    def not_modified(self, response):
+        return response.status_code == 304
+
+    def payload(self, url, namespace):
+        """Results this namespace parsed from the last full download of the URL"""
+        entry = self.load(url, namespace)
+        return entry.get('payload') if entry else None
+
+    def store(self, url, namespace, response, payload):
+        """
+        Remember a response's validators together with what was parsed from it
+        Call only after parsing succeeded, so a 304 always has results to reuse
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return  # server doesn't support conditional requests
+
+        entry = {
+            'namespace': namespace,
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': datetime.now().isoformat(),
+            'payload': payload
+        }
+        self.cache_dir.mkdir(exist_ok=True)
+        path = self._path(url, namespace)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+# Shared by all scrapers
+validator_cache = ValidatorCache()
@@ -0,0 +1,99 @@
+"""
+Shared pooled HTTP client for all scrapers
+One keep-alive requests.Session with per-host connection pools and a
+default timeout. Scrapers take it as an injectable `session` argument
+instead of calling requests directly, so connections (and TLS
+handshakes) are reused across every request in a run.
+Every request goes through the per-source retry / hedge / circuit
+breaker policy in resilience.py, and waits for the host's cross-process
+rate limit (rate_limiter.py). HTTP_REPLAY_MODE=record|replay puts the
+http_replay fixture adapter underneath (see http_replay.py).
+"""
+import os
+import threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from resilience import call_with_resilience, circuit_breakers
+from rate_limiter import rate_limiter
+import http_replay
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+
+# Hosts that see several requests in flight at once get bigger pools
+HOST_POOL_SIZES = {
+    'maps.nashville.gov': 8,
+    'data.chattlibrary.org': 4,
+    'www.chattadata.org': 4,
+    'data.austintexas.gov': 4,
+    'data.sanantonio.gov': 2
+}
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a default timeout, per-host pool sizing and per-source resilience"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE, host_pool_sizes=None,
+                 breakers=circuit_breakers, limiter=rate_limiter):
+        super().__init__()
+        self.timeout = timeout
+        self.breakers = breakers  # None = plain requests, no retries or breakers
+        self.limiter = limiter    # None = no per-host rate limits
+        # requests already advertises gzip/deflate (and br/zstd when available)
+        self.headers.update({'User-Agent': USER_AGENT})
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        # The longest matching prefix wins, so these override the default pool
+        if host_pool_sizes is None:
+            host_pool_sizes = HOST_POOL_SIZES
+        for host, size in host_pool_sizes.items():
+            self.mount(f'https://{host}/', HTTPAdapter(pool_connections=1, pool_maxsize=size))
+
+        replay_mode = os.getenv('HTTP_REPLAY_MODE')
+        if replay_mode:
+            http_replay.install(self, replay_mode)
+            if replay_mode == 'replay':
+                # Offline runs must not trip (or persist) the live breakers or wait on rate limits
+                self.breakers = None
+                self.limiter = None
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).hostname
+        
+        def throttle():
+            # Every attempt (retries and hedges too) takes its own token
+            if self.limiter is not None:
+                self.limiter.acquire(host)
+        
+        def send():
+            response = super(PooledSession, self).request(method, url, **kwargs)
+            if self.limiter is not None:
+                self.limiter.observe(host, response)
+            return response
+        
+        if self.breakers is None:
+            throttle()
+            return send()
+        # Streamed bodies are read by the caller, so they're never raced
+        return call_with_resilience(host, method, send, breakers=self.breakers,
+                                    hedge=not kwargs.get('stream'), before_send=throttle)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """The process-wide shared session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PooledSession()
+        return _session
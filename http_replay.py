@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Record / replay harness for the shared HTTP client
+Set HTTP_REPLAY_MODE=record to capture every response the scrapers get
+(ArcGIS, Socrata, the OpenGov CSV, Accela/county HTML and PDFs) into
+fixture files, then HTTP_REPLAY_MODE=replay to serve them back offline
+at full speed. Replayed responses are real urllib3 responses, so
+streaming readers (response.raw, iter_csv_response) work unchanged.
+
+Requests are matched exactly (method + URL + body) first. Queries whose
+parameters move with the clock (30-day windows, watermarks, keyset
+cursors) fall back to the next recorded response for the same endpoint
+and parameter names, in the order they were recorded.
+
+    python http_replay.py record            # one live run of every scraper
+    python http_replay.py bench --runs 5    # offline benchmark
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+FIXTURES_DIR = Path(os.getenv('HTTP_FIXTURES_DIR', Path(__file__).parent / 'http_fixtures'))
+
+# Validators would turn recorded 200s into 304s on later runs - fixtures always hold full bodies
+STRIPPED_REQUEST_HEADERS = ('If-None-Match', 'If-Modified-Since')
+# The body is stored decoded, so these no longer describe it
+STRIPPED_RESPONSE_HEADERS = ('Content-Encoding', 'Content-Length', 'Transfer-Encoding')
+
+
+def _body_bytes(body):
+    body = body or b''
+    return body.encode('utf-8') if isinstance(body, str) else body
+
+
+def exact_key(method, url, body=None):
+    """Method + URL (query sorted) + body"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    digest = hashlib.sha1(f"{method} {parts.scheme}://{parts.netloc}{parts.path}?{query}".encode())
+    digest.update(_body_bytes(body))
+    return digest.hexdigest()
+
+
+def loose_key(method, url):
+    """Method + endpoint + parameter names (values ignored)"""
+    parts = urlsplit(url)
+    names = ','.join(sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)}))
+    return f"{method} {parts.netloc}{parts.path}?{names}"
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter that records responses to, or replays them from, fixture files"""
+
+    def __init__(self, mode, fixtures_dir=FIXTURES_DIR, **kwargs):
+        super().__init__(**kwargs)
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"HTTP_REPLAY_MODE must be 'record' or 'replay', not {mode!r}")
+        self.mode = mode
+        self.fixtures_dir = Path(fixtures_dir)
+        self._lock = threading.Lock()
+        self._index = None
+        self._cursors = {}
+
+    # ==================== FIXTURE INDEX ====================
+
+    def _index_path(self):
+        return self.fixtures_dir / 'index.json'
+
+    def _load_index(self):
+        """{'exact': {key: file}, 'loose': {key: [file, ...]}}"""
+        if self._index is None:
+            try:
+                with open(self._index_path(), 'r') as f:
+                    self._index = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = {'exact': {}, 'loose': {}}
+        return self._index
+
+    def _save_index(self):
+        tmp_path = self._index_path().with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self._index_path())
+
+    # ==================== RECORD / REPLAY ====================
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        for header in STRIPPED_REQUEST_HEADERS:
+            request.headers.pop(header, None)
+
+        if self.mode == 'record':
+            live = super().send(request, stream=False, timeout=timeout, verify=verify,
+                                cert=cert, proxies=proxies)
+            fixture = self.record(request.method, request.url, request.body,
+                                  live.status_code, live.reason, live.headers, live.content)
+        else:
+            fixture = self.lookup(request.method, request.url, request.body)
+
+        return self._build(request, fixture)
+
+    def record(self, method, url, body, status, reason, headers, content):
+        """Store one live response; returns the fixture"""
+        fixture = {
+            'method': method,
+            'url': url,
+            'status': status,
+            'reason': reason,
+            'headers': {name: value for name, value in headers.items()
+                        if name.title() not in STRIPPED_RESPONSE_HEADERS},
+            'body': base64.b64encode(content).decode('ascii')
+        }
+        key = exact_key(method, url, body)
+        filename = f"{key}.json"
+
+        with self._lock:
+            self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.fixtures_dir / filename, 'w') as f:
+                json.dump(fixture, f)
+
+            index = self._load_index()
+            # A retried or hedged duplicate isn't a new step in the sequence
+            if key not in index['exact']:
+                index['exact'][key] = filename
+                index['loose'].setdefault(loose_key(method, url), []).append(filename)
+                self._save_index()
+
+        return fixture
+
+    def lookup(self, method, url, body=None):
+        """Recorded fixture for a request (raises ConnectionError when there is none)"""
+        with self._lock:
+            index = self._load_index()
+            filename = index['exact'].get(exact_key(method, url, body))
+            if filename is None:
+                key = loose_key(method, url)
+                recorded = index['loose'].get(key, [])
+                position = self._cursors.get(key, 0)
+                if position < len(recorded):
+                    filename = recorded[position]
+                    self._cursors[key] = position + 1
+
+        if filename is None:
+            raise requests.exceptions.ConnectionError(f"No recorded response for {method} {url}")
+        with open(self.fixtures_dir / filename, 'r') as f:
+            return json.load(f)
+
+    def rewind(self):
+        """Start replaying every endpoint's sequence from its first response again"""
+        with self._lock:
+            self._cursors.clear()
+
+    def _build(self, request, fixture):
+        body = base64.b64decode(fixture['body'])
+        headers = dict(fixture['headers'], **{'Content-Length': str(len(body))})
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=fixture['status'],
+            reason=fixture['reason'],
+            preload_content=False,
+            decode_content=False
+        )
+        return self.build_response(request, raw)
+
+
+_adapters = {}
+_adapters_lock = threading.Lock()
+
+
+def get_adapter(mode, fixtures_dir=FIXTURES_DIR):
+    """One adapter per fixtures dir, so every session in the process shares its index"""
+    key = (mode, str(fixtures_dir))
+    with _adapters_lock:
+        if key not in _adapters:
+            _adapters[key] = ReplayAdapter(mode, fixtures_dir)
+        return _adapters[key]
+
+
+def async_transport(mode, fixtures_dir=FIXTURES_DIR):
+    """httpx transport over the same fixtures, for the async county scrapers"""
+    import httpx
+
+    class AsyncReplayTransport(httpx.AsyncBaseTransport):
+        def __init__(self):
+            self.fixtures = get_adapter(mode, fixtures_dir)
+            self.live = httpx.AsyncHTTPTransport() if mode == 'record' else None
+
+        async def handle_async_request(self, request):
+            for header in STRIPPED_REQUEST_HEADERS:
+                request.headers.pop(header, None)
+            method, url, body = request.method, str(request.url), request.content
+
+            if self.live is not None:
+                response = await self.live.handle_async_request(request)
+                content = await response.aread()
+                await response.aclose()
+                fixture = self.fixtures.record(method, url, body, response.status_code,
+                                               response.extensions.get('reason_phrase', b'').decode('ascii'),
+                                               response.headers, content)
+            else:
+                try:
+                    fixture = self.fixtures.lookup(method, url, body)
+                except requests.exceptions.ConnectionError as e:
+                    raise httpx.ConnectError(str(e), request=request)
+
+            headers = [(name, value) for name, value in fixture['headers'].items()]
+            return httpx.Response(fixture['status'], headers=headers,
+                                  content=base64.b64decode(fixture['body']), request=request)
+
+        async def aclose(self):
+            if self.live is not None:
+                await self.live.aclose()
+
+    return AsyncReplayTransport()
+
+
+def install(session, mode, fixtures_dir=FIXTURES_DIR):
+    """Route every mount of a session (host-specific ones too) through the shared ReplayAdapter"""
+    adapter = get_adapter(mode, fixtures_dir)
+    for prefix in list(session.adapters):
+        session.mount(prefix, adapter)
+    return adapter
+
+
+# ==================== BENCHMARK ====================
+
+@contextmanager
+def scratch_state():
+    """Point the databases, watermarks, checkpoints and on-disk caches at a temp dir"""
+    import incremental_scraper
+    import socrata_client
+    import watermarks
+    from http_cache import validator_cache
+    from lead_store import LeadStore
+    from lead_log import LeadLog
+    from resilience import circuit_breakers
+    from scrapers import pdf_extractor
+    from scrapers.link_cache import link_cache
+
+    saved = (incremental_scraper.lead_store, incremental_scraper.lead_log, watermarks.WATERMARKS_PATH,
+             socrata_client.CHECKPOINT_DIR, validator_cache.cache_dir, pdf_extractor.PDF_CACHE_DIR,
+             link_cache.path, link_cache._entries,
+             circuit_breakers.path, circuit_breakers._state, circuit_breakers._mtime)
+    scratch = Path(tempfile.mkdtemp(prefix='permit_bench_'))
+    try:
+        incremental_scraper.lead_store = LeadStore(scratch / 'leads.sqlite3', legacy_path=None)
+        incremental_scraper.lead_log = LeadLog(scratch / 'lead_log')
+        watermarks.WATERMARKS_PATH = scratch / 'watermarks.json'
+        socrata_client.CHECKPOINT_DIR = scratch / 'socrata_checkpoints'
+        validator_cache.cache_dir = scratch / 'http_cache'
+        pdf_extractor.PDF_CACHE_DIR = scratch / 'pdf_text_cache'
+        # Shared singletons - swap their files (and drop what they cached from the real ones)
+        link_cache.path, link_cache._entries = scratch / 'discovered_links.json', None
+        circuit_breakers.path, circuit_breakers._state, circuit_breakers._mtime = \
+            scratch / 'circuit_breakers.json', {}, None
+        yield scratch
+    finally:
+        (incremental_scraper.lead_store, incremental_scraper.lead_log, watermarks.WATERMARKS_PATH,
+         socrata_client.CHECKPOINT_DIR, validator_cache.cache_dir, pdf_extractor.PDF_CACHE_DIR,
+         link_cache.path, link_cache._entries,
+         circuit_breakers.path, circuit_breakers._state, circuit_breakers._mtime) = saved
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def benchmark_targets():
+    from multi_region_scraper import scrape_all_regions
+    from incremental_scraper import scrape_all_regions_incremental
+    from scrapers.orchestrator import ScraperOrchestrator
+
+    return {
+        'scrape_all_regions': scrape_all_regions,
+        'scrape_all_regions_incremental': scrape_all_regions_incremental,
+        'ScraperOrchestrator.scrape_all': lambda: ScraperOrchestrator().scrape_all()
+    }
+
+
+def run_targets(runs, only=None):
+    timings = {}
+    for name, target in benchmark_targets().items():
+        if only and name not in only:
+            continue
+        timings[name] = []
+        for _ in range(runs):
+            # Demo sources use random - keep their output identical run to run
+            random.seed(0)
+            for adapter in _adapters.values():
+                adapter.rewind()
+            with scratch_state():
+                started = time.perf_counter()
+                target()
+                timings[name].append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record or replay scraper HTTP traffic')
+    parser.add_argument('mode', choices=['record', 'bench'])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--only', nargs='*', help='benchmark only these targets')
+    args = parser.parse_args()
+
+    # Must be set before the shared session is created
+    os.environ['HTTP_REPLAY_MODE'] = 'record' if args.mode == 'record' else 'replay'
+    timings = run_targets(1 if args.mode == 'record' else args.runs, args.only)
+
+    print("\n" + "="*70)
+    print(f"⏱️  {'RECORDED' if args.mode == 'record' else 'REPLAY BENCHMARK'} ({FIXTURES_DIR})")
+    print("="*70)
+    for name, samples in timings.items():
+        best = min(samples)
+        mean = sum(samples) / len(samples)
+        print(f"   {name:<34} best {best:7.3f}s   mean {mean:7.3f}s   runs {len(samples)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,134 +4,150 @@ Incremental Scraper - Only pulls NEW leads, no duplicates
 Tracks permit numbers and only adds unseen permits to database
 """
 
-import requests
-import json
 import random
-from datetime import datetime
-from pathlib import Path
-
-# Database path
-DB_PATH = Path(__file__).parent / 'leads_db' / 'current_leads.json'
+from datetime import datetime, timezone
+from http_client import get_session
+from contextlib import closing
+from watermarks import load_watermarks, save_watermarks, is_newer
+from socrata_client import SocrataClient
+from arcgis_client import ArcGISLayer
+from csv_stream import iter_csv_response
+from http_cache import validator_cache
+from permit_filters import PermitFilter, combine_where
+from source_registry import SourceRegistry
+from lead_store import lead_store, has_permit_number
+from lead_log import lead_log
 
 # ==================== DUPLICATE DETECTION ====================
 
 def load_existing_leads():
-    """Load current database and extract all permit numbers"""
-    try:
-        with open(DB_PATH, 'r') as f:
-            db = json.load(f)
-        
-        # Extract all permit numbers from existing leads
-        seen_permits = set()
-        for state, counties in db.get('leads', {}).items():
-            for county, leads in counties.items():
-                for lead in leads:
-                    permit_num = lead.get('permit_number', '')
-                    if permit_num:
-                        seen_permits.add(permit_num)
-        
-        print(f"📊 Loaded database: {len(seen_permits)} existing permits tracked")
-        return db, seen_permits
-    except FileNotFoundError:
-        print("📊 No existing database found, creating new one")
-        return {'last_updated': None, 'leads': {}}, set()
+    """Open the lead store (duplicates are checked against its index per run, nothing is preloaded)"""
+    print(f"📊 Lead store: {lead_store.path}")
+    return lead_store
 
 def is_duplicate(permit_number, seen_permits):
     """Check if permit number already exists"""
     return permit_number in seen_permits
 
-def merge_new_leads(existing_db, new_leads_by_region, seen_permits):
-    """Merge new leads into existing database, avoiding duplicates"""
+def merge_new_leads(store, new_leads_by_region):
+    """Insert new leads into the lead store, avoiding duplicates"""
     added_count = 0
     duplicate_count = 0
+    updated_at = datetime.now().isoformat()
+    added_by_region = {}
+    
+    # One batched lookup for the whole run; repeats within the run are caught as they're added
+    seen_permits = store.existing_permits(
+        lead.get('permit_number', '') for leads in new_leads_by_region.values() for lead in leads
+    )
     
     for region_key, counties in new_leads_by_region.items():
         state, county = region_key.split('/')
-        
-        # Ensure structure exists
-        if state not in existing_db['leads']:
-            existing_db['leads'][state] = {}
-        if county not in existing_db['leads'][state]:
-            existing_db['leads'][state][county] = []
+        fresh = []
         
         for lead in counties:
             permit_num = lead.get('permit_number', '')
             
-            if is_duplicate(permit_num, seen_permits):
+            if not has_permit_number(lead):
+                fresh.append(lead)  # add_leads reports and skips it
+            elif is_duplicate(permit_num, seen_permits):
                 duplicate_count += 1
                 print(f"   ⏭️  Skipping duplicate: {permit_num}")
             else:
                 # Add first_seen timestamp
-                lead['first_seen'] = datetime.now().isoformat()
-                existing_db['leads'][state][county].append(lead)
+                lead['first_seen'] = updated_at
+                fresh.append(lead)
                 seen_permits.add(permit_num)
-                added_count += 1
-                print(f"   ✅ NEW: {permit_num} - {lead.get('address', 'Unknown')}")
+        
+        # One transaction per region; UNIQUE(permit_number) catches any concurrent writer
+        added = store.add_leads(state, county, fresh, updated_at=updated_at)
+        for lead in added:
+            added_count += 1
+            print(f"   ✅ NEW: {lead.get('permit_number', '')} - {lead.get('address', 'Unknown')}")
+        if added:
+            added_by_region[region_key] = added
     
-    existing_db['last_updated'] = datetime.now().isoformat()
+    # Append-only history of this run's leads (one new segment, never a rewrite)
+    lead_log.append_run(added_by_region)
     
-    return existing_db, added_count, duplicate_count
-
-def save_database(db):
-    """Save database to JSON file"""
-    DB_PATH.parent.mkdir(exist_ok=True)
-    with open(DB_PATH, 'w') as f:
-        json.dump(db, f, indent=2)
-    print(f"💾 Database saved to {DB_PATH}")
+    return updated_at, added_count, duplicate_count
 
 # ==================== SCRAPERS (NO DUPLICATES) ====================
 
-def scrape_nashville_davidson():
-    """Nashville-Davidson County - FIXED VERSION - Gets 272 permits from last 30 days"""
+# Adapters register by (state, county); the name is their region key in the database
+SOURCES = SourceRegistry()
+
+# What each source should return - pushed down into the source's query
+# language where it has a matching field, checked locally otherwise
+SOURCE_FILTERS = {
+    'nashville_davidson': PermitFilter(days=30),
+    'chattanooga_hamilton': PermitFilter(days=30),
+    'austin_travis': PermitFilter(days=30, classes=['Residential'], class_match='exact'),
+    'san_antonio_bexar': PermitFilter(
+        days=30,
+        classes=['building', 'commercial', 'residential', 'mep', 'trade', 'repair']
+    )
+}
+
+NASHVILLE_LAYER = "https://maps.nashville.gov/arcgis/rest/services/Codes/BuildingPermits/MapServer/0"
+NASHVILLE_SOURCE = 'nashville_davidson'
+NASHVILLE_MARK_FIELDS = ('DATE_ACCEPTED', 'OBJECTID')
+# Only the attributes we map - pushed down instead of outFields=*
+NASHVILLE_FIELDS = ['OBJECTID', 'CASE_NUMBER', 'LOCATION', 'CASE_TYPE_DESC', 'CONSTVAL', 'SCOPE', 'DATE_ACCEPTED']
+NASHVILLE_FILTER_FIELDS = {'date': 'DATE_ACCEPTED', 'class': 'CASE_TYPE_DESC', 'value': 'CONSTVAL'}
+
+def nashville_where(watermark):
+    """ArcGIS where clause for records newer than the watermark"""
+    if not watermark:
+        return None
+    since = datetime.fromtimestamp(watermark['DATE_ACCEPTED'] / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Same timestamp as the last seen record - OBJECTID breaks the tie
+    return (f"DATE_ACCEPTED > TIMESTAMP '{since}' OR "
+            f"(DATE_ACCEPTED = TIMESTAMP '{since}' AND OBJECTID > {watermark.get('OBJECTID', 0)})")
+
+@SOURCES.register('TN', 'Davidson', name='tennessee/nashville', host='maps.nashville.gov',
+                  cost=3, latency=15.0, cadence='realtime', capabilities=('live', 'arcgis', 'watermarks', 'pushdown'))
+def scrape_nashville_davidson(watermarks=None, session=None):
+    """Nashville-Davidson County - only pulls permits newer than the stored watermark
+    
+    watermarks: dict from watermarks.load_watermarks(); advanced in place once
+    every new record has been read. The caller persists it after saving leads.
+    """
     permits = []
+    if watermarks is None:
+        watermarks = {}
+    
     try:
-        print("🕷️  Scraping Nashville-Davidson County (Last 30 days)...")
+        print("🕷️  Scraping Nashville-Davidson County (new since last run)...")
         
-        url = "https://maps.nashville.gov/arcgis/rest/services/Codes/BuildingPermits/MapServer/0/query"
+        layer = ArcGISLayer(NASHVILLE_LAYER, session=session, timeout=30)
+        pushed, local = SOURCE_FILTERS[NASHVILLE_SOURCE].split(NASHVILLE_FILTER_FIELDS)
         
-        # THE FIX: Use orderByFields WITHOUT resultRecordCount or resultOffset
-        # Pagination with resultOffset causes 400 errors
-        # This returns 1000 most recent permits sorted by date
-        params = {
-            'where': '1=1',  # No date filter - orderBy gets recent first
-            'outFields': '*',
-            'returnGeometry': 'false',
-            'orderByFields': 'DATE_ACCEPTED DESC',
-            'f': 'json'
-        }
+        # Ids first, then parallel objectIds chunks - no 1000-record cap and
+        # no resultOffset paging (which causes 400 errors on this layer)
+        watermark = watermarks.get(NASHVILLE_SOURCE)
+        newest = watermark
+        where = combine_where(nashville_where(watermark), pushed.to_arcgis_where(NASHVILLE_FILTER_FIELDS)) or '1=1'
         
-        response = requests.get(url, params=params, timeout=30)
-        
-        if response.status_code != 200:
-            print(f"   ❌ HTTP {response.status_code}")
-            return permits
-        
-        data = response.json()
-        features = data.get('features', [])
-        
-        if not features:
-            print("   ⚠️  No records returned")
-            return permits
-        
-        # Filter to last 30 days
-        from datetime import timedelta
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        
-        for feature in features:
-            attrs = feature.get('attributes', {})
-            
+        for attrs in layer.iter_features(where=where, out_fields=NASHVILLE_FIELDS):
             date_accepted = attrs.get('DATE_ACCEPTED')
             if not date_accepted:
                 continue
             
+            mark = {field: attrs.get(field) for field in NASHVILLE_MARK_FIELDS}
+            if not is_newer(mark, watermark, NASHVILLE_MARK_FIELDS):
+                continue
+            if is_newer(mark, newest, NASHVILLE_MARK_FIELDS):
+                newest = mark
+            
             permit_date = datetime.fromtimestamp(date_accepted / 1000)
+            const_val = attrs.get('CONSTVAL', 0) or 0
             
-            # Only keep last 30 days
-            if permit_date < thirty_days_ago:
+            if not local.matches(permit_date, attrs.get('CASE_TYPE_DESC'), const_val):
                 continue
             
             date_str = permit_date.strftime('%Y-%m-%d')
-            const_val = attrs.get('CONSTVAL', 0) or 0
             
             permit = {
                 'permit_number': attrs.get('CASE_NUMBER', 'N/A'),
@@ -146,7 +162,14 @@ def scrape_nashville_davidson():
             }
             permits.append(permit)
         
-        print(f"   🔍 Found {len(permits)} Nashville permits (last 30 days)")
+        # Only advance once the whole extraction succeeded - a failed chunk
+        # must not let the watermark skip past records we never read
+        if newest:
+            watermarks[NASHVILLE_SOURCE] = newest
+        
+        if not permits:
+            print("   ⚠️  No new records since last run")
+        print(f"   🔍 Found {len(permits)} new Nashville permits")
     except Exception as e:
         print(f"   ❌ Nashville error: {e}")
     
@@ -154,58 +177,46 @@ def scrape_nashville_davidson():
 
 
 
-def scrape_chattanooga_hamilton():
+@SOURCES.register('TN', 'Hamilton', name='tennessee/chattanooga', host='data.chattlibrary.org',
+                  cost=2, latency=20.0, cadence='daily', capabilities=('live', 'socrata', 'pushdown'))
+def scrape_chattanooga_hamilton(session=None):
     """Chattanooga/Hamilton County - Socrata API - Gets permits from last 30 days"""
     permits = []
     try:
         print("🕷️  Scraping Chattanooga/Hamilton County (Last 30 days)...")
         
-        from datetime import datetime, timedelta
         import re
         
-        url = "https://data.chattlibrary.org/resource/764y-vxm2.json"
+        client = SocrataClient('data.chattlibrary.org', '764y-vxm2', session=session, timeout=45)
         
-        # Calculate 30 days ago
-        thirty_days_ago = datetime.now() - timedelta(days=30)
+        # The 30-day window is applied server-side, so the walk ends on its own
+        fields = {'date': 'applieddate', 'class': ['permittype', 'permitclass']}
+        pushed, local = SOURCE_FILTERS['chattanooga_hamilton'].split(fields)
         
-        # Get recent permits using pagination (Socrata API likes this better)
-        limit = 1000
-        offset = 0
         max_permits = 2000  # Safety limit
         
-        while len(permits) < max_permits:
-            params = {
-                '$order': 'applieddate DESC',
-                '$limit': limit,
-                '$offset': offset
-            }
-            
-            response = requests.get(url, params=params, timeout=45)
-            
-            if response.status_code != 200:
-                break
-            
-            data = response.json()
-            if not data:
-                break
-            
-            for permit in data:
+        # Keyset pagination newest-first. Not checkpointed: leads are only stored after every
+        # source has run, so a resumed walk would skip the pages a crashed run never saved -
+        # the bounded 30-day window is re-walked instead and the permit index drops repeats
+        with closing(client.iter_rows(where=pushed.to_soql_where(fields), page_size=1000)) as rows:
+            for permit in rows:
+                if len(permits) >= max_permits:
+                    break
+                
                 # Check date
                 applied_date = permit.get('applieddate', '')
                 if applied_date:
                     try:
                         date_obj = datetime.fromisoformat(applied_date.replace('T', ' ').split('.')[0])
-                        
-                        # Stop if we've gone past 30 days
-                        if date_obj < thirty_days_ago:
-                            return permits
-                        
                         permit_date = date_obj.strftime('%Y-%m-%d')
                     except:
                         continue
                 else:
                     continue
                 
+                if not local.matches(date_obj, permit.get('permittype')):
+                    continue
+                
                 # Extract permit data
                 permit_number = permit.get('permitnum', '')
                 if not permit_number:
@@ -242,13 +253,6 @@ def scrape_chattanooga_hamilton():
                     'score': 90,
                     'source': 'Chattanooga Open Data'
                 })
-            
-            # Check if we got less than limit (last page)
-            if len(data) < limit:
-                break
-            
-            offset += limit
-            print(f"   📄 Fetched {len(permits)} permits so far...")
         
         print(f"   ✅ Found {len(permits)} permits")
     
@@ -258,6 +262,8 @@ def scrape_chattanooga_hamilton():
     return permits
 
 
+@SOURCES.register('TX', 'Dallas', name='texas/dallas', cost=0, latency=0.1,
+                  cadence='static', capabilities=('demo',))
 def scrape_dallas_county():
     """Dallas County - Sample data (API research needed)"""
     permits = []
@@ -284,30 +290,27 @@ def scrape_dallas_county():
     
     return permits
 
-def scrape_austin_travis():
+@SOURCES.register('TX', 'Travis', name='texas/travis', host='data.austintexas.gov',
+                  cost=3, latency=15.0, cadence='daily', capabilities=('live', 'socrata', 'pushdown'))
+def scrape_austin_travis(session=None):
     """Austin-Travis County - REAL DATA from Socrata API (Last 30 days)"""
     permits = []
     try:
         print("🕷️  Scraping Austin-Travis County (Socrata API - Last 30 days)...")
         
-        url = "https://data.austintexas.gov/resource/3syk-w9eu.json"
+        client = SocrataClient('data.austintexas.gov', '3syk-w9eu', session=session, timeout=15)
         
-        # Calculate 30 days ago in ISO format
-        from datetime import timedelta
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        date_filter = thirty_days_ago.strftime('%Y-%m-%d')
+        # Residential + last 30 days, both pushed into $where
+        fields = {'date': 'applieddate', 'class': 'permit_class_mapped', 'value': 'total_job_valuation'}
+        pushed, local = SOURCE_FILTERS['austin_travis'].split(fields)
         
-        params = {
-            '$limit': '5000',
-            '$order': 'applieddate DESC',
-            '$where': f"permit_class_mapped='Residential' AND applieddate >= '{date_filter}'"
-        }
+        rows = client.iter_rows(
+            where=pushed.to_soql_where(fields),
+            page_size=1000,
+            max_rows=5000
+        )
         
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        for record in data:
+        for record in rows:
             value = 0
             if record.get('total_job_valuation'):
                 try:
@@ -315,6 +318,9 @@ def scrape_austin_travis():
                 except:
                     pass
             
+            if not local.matches(permit_class=record.get('permit_class_mapped'), value=value):
+                continue
+            
             permit = {
                 'permit_number': record.get('permit_number', 'Unknown'),
                 'address': record.get('permit_location', 'Unknown'),
@@ -334,59 +340,60 @@ def scrape_austin_travis():
     
     return permits
 
-def scrape_san_antonio_bexar():
+@SOURCES.register('TX', 'Bexar', name='texas/bexar', host='data.sanantonio.gov',
+                  cost=5, latency=45.0, cadence='daily', capabilities=('live', 'csv', 'conditional'))
+def scrape_san_antonio_bexar(session=None):
     """San Antonio-Bexar County - REAL DATA from OpenGov CSV (Last 30 days)"""
     permits = []
     try:
         print("🕷️  Scraping San Antonio-Bexar County (OpenGov CSV - Last 30 days)...")
         
-        from datetime import timedelta
-        thirty_days_ago = datetime.now() - timedelta(days=30)
+        # A flat file - nothing to push down, every criterion is checked per row
+        source_filter = SOURCE_FILTERS['san_antonio_bexar']
         
         csv_url = 'https://data.sanantonio.gov/dataset/05012dcb-ba1b-4ade-b5f3-7403bc7f52eb/resource/fbb7202e-c6c1-475b-849e-c5c2cfb65833/download/accelasubmitpermitsextract.csv'
         
-        response = requests.get(csv_url, timeout=30)
-        response.raise_for_status()
-        
-        import csv
-        from io import StringIO
-        
-        csv_data = StringIO(response.text)
-        reader = csv.DictReader(csv_data)
-        
-        count = 0
-        for row in reader:
-            permit_type = row.get('PERMIT TYPE', '')
-            if not any(keyword in permit_type.lower() for keyword in ['building', 'commercial', 'residential', 'mep', 'trade', 'repair']):
-                continue
-            
-            # Check date is within last 30 days
-            date_issued = row.get('DATE ISSUED', '')
-            if date_issued:
-                try:
-                    from datetime import datetime as dt
-                    permit_date = dt.strptime(date_issued.split()[0], '%m/%d/%Y')
-                    if permit_date < thirty_days_ago:
-                        continue
-                except:
-                    pass  # If date parsing fails, include the permit
+        # Conditional GET - a 304 means the city hasn't republished the extract
+        with validator_cache.get(csv_url, 'incremental', session=session, stream=True, timeout=30) as response:
+            if validator_cache.not_modified(response):
+                permits = validator_cache.payload(csv_url, 'incremental')
+                print(f"   ♻️  Extract unchanged since last run, reusing {len(permits)} parsed permits")
+                return permits
+            response.raise_for_status()
             
-            permit = {
-                'permit_number': row.get('PERMIT #', ''),
-                'address': row.get('ADDRESS', ''),
-                'permit_type': permit_type,
-                'estimated_value': int(float(row.get('DECLARED VALUATION', 0) or 0)),
-                'work_description': row.get('WORK TYPE', '')[:200],
-                'score': 86,
-                'date': date_issued,
-                'contractor': row.get('PRIMARY CONTACT', 'TBD'),
-                'owner': row.get('PRIMARY CONTACT', 'TBD')
-            }
-            permits.append(permit)
-            count += 1
-            
-            if count >= 5000:  # Increased limit since we're filtering by date
-                break
+            # Stream rows as they download - leaving the loop early drops the connection
+            count = 0
+            for row in iter_csv_response(response):
+                permit_type = row.get('PERMIT TYPE', '')
+                date_issued = row.get('DATE ISSUED', '')
+                permit_date = None
+                if date_issued:
+                    try:
+                        permit_date = datetime.strptime(date_issued.split()[0], '%m/%d/%Y')
+                    except:
+                        pass  # If date parsing fails, include the permit
+                
+                if not source_filter.matches(permit_date, permit_type):
+                    continue
+                
+                permit = {
+                    'permit_number': row.get('PERMIT #', ''),
+                    'address': row.get('ADDRESS', ''),
+                    'permit_type': permit_type,
+                    'estimated_value': int(float(row.get('DECLARED VALUATION', 0) or 0)),
+                    'work_description': row.get('WORK TYPE', '')[:200],
+                    'score': 86,
+                    'date': date_issued,
+                    'contractor': row.get('PRIMARY CONTACT', 'TBD'),
+                    'owner': row.get('PRIMARY CONTACT', 'TBD')
+                }
+                permits.append(permit)
+                count += 1
+                
+                if count >= 5000:  # Increased limit since we're filtering by date
+                    break
+        
+        validator_cache.store(csv_url, 'incremental', response, permits)
         
         print(f"   🔍 Found {len(permits)} San Antonio permits")
     except Exception as e:
@@ -396,56 +403,38 @@ def scrape_san_antonio_bexar():
 
 # ==================== MAIN SCRAPING FUNCTION ====================
 
-def scrape_all_regions_incremental():
+def scrape_all_regions_incremental(session=None):
     """Scrape all regions and only add new leads"""
+    session = session or get_session()
+    
     print("\n" + "="*70)
     print("🌐 INCREMENTAL SCRAPING SESSION - NO DUPLICATES")
     print("="*70)
     
     # Load existing database
-    existing_db, seen_permits = load_existing_leads()
+    store = load_existing_leads()
+    watermarks = load_watermarks()
     
-    # Scrape each region
+    # Scrape each registered region (sources with an open circuit are skipped)
     new_leads_by_region = {}
     
-    # Nashville-Davidson (Tennessee)
-    nashville_leads = scrape_nashville_davidson()
-    if nashville_leads:
-        new_leads_by_region['tennessee/nashville'] = nashville_leads
-    
-    
-    # Chattanooga (Tennessee)
-    chattanooga_leads = scrape_chattanooga_hamilton()
-    if chattanooga_leads:
-        new_leads_by_region['tennessee/chattanooga'] = chattanooga_leads
-    # Dallas (Texas)
-    dallas_leads = scrape_dallas_county()
-    if dallas_leads:
-        new_leads_by_region['texas/dallas'] = dallas_leads
-    
-    # Austin-Travis (Texas)
-    austin_leads = scrape_austin_travis()
-    if austin_leads:
-        new_leads_by_region['texas/travis'] = austin_leads
-    
-    # San Antonio-Bexar (Texas)
-    san_antonio_leads = scrape_san_antonio_bexar()
-    if san_antonio_leads:
-        new_leads_by_region['texas/bexar'] = san_antonio_leads
+    for source in SOURCES.plan(session=session):
+        leads = source.call(session=session, watermarks=watermarks)
+        if leads:
+            new_leads_by_region[source.name] = leads
     
     # Merge new leads (avoiding duplicates)
     print("\n" + "="*70)
     print("🔍 CHECKING FOR DUPLICATES")
     print("="*70)
     
-    updated_db, added_count, duplicate_count = merge_new_leads(
-        existing_db, 
-        new_leads_by_region, 
-        seen_permits
-    )
+    # Inserting is saving - only the new leads are written
+    last_updated, added_count, duplicate_count = merge_new_leads(store, new_leads_by_region)
     
-    # Save updated database
-    save_database(updated_db)
+    # Move the watermarks past what we saved
+    save_watermarks(watermarks)
+    lead_log.compact_in_background()
+    total = store.count()
     
     # Summary
     print("\n" + "="*70)
@@ -453,14 +442,14 @@ def scrape_all_regions_incremental():
     print("="*70)
     print(f"✅ New leads added: {added_count}")
     print(f"⏭️  Duplicates skipped: {duplicate_count}")
-    print(f"📦 Total leads in database: {len(seen_permits) + added_count}")
-    print(f"🕒 Last updated: {updated_db['last_updated']}")
+    print(f"📦 Total leads in database: {total}")
+    print(f"🕒 Last updated: {last_updated}")
     print("="*70 + "\n")
     
     return {
         'added': added_count,
         'duplicates': duplicate_count,
-        'total': len(seen_permits) + added_count
+        'total': total
     }
 
 if __name__ == '__main__':
@@ -0,0 +1,185 @@
+"""
+Append-only lead log - one JSON-Lines segment per scraping run
+Every run's new leads are also written as an immutable segment next to
+the lead store: a crash-safe history that downstream exports and a
+rebuild of the store can read without touching the database. Writing a
+segment costs the same however long the history is (temp file, fsync,
+rename), and a crash mid-write leaves no partial segment behind.
+
+Segments are merged by the compactor once there are enough of them.
+Compaction writes the merged segment the same way before deleting its
+inputs, so a crash at any point leaves every lead readable (at worst
+twice, and readers skip repeated permit numbers). The cron scraper and
+the scheduler may both compact, so compaction holds an exclusive lock
+on the log directory and readers a shared one.
+
+    python lead_log.py compact
+    python lead_log.py replay     # re-add every logged lead to the lead store
+"""
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+LEAD_LOG_DIR = Path(__file__).parent / 'leads_db' / 'lead_log'
+LOCK_FILE_NAME = '.lock'
+COMPACT_THRESHOLD = 30  # segments before a run triggers compaction
+
+
+def _fsync_dir(directory):
+    """Make a rename in directory durable (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(path, records):
+    """Write records as JSON Lines to path via temp file + fsync + rename"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path.parent)
+
+
+class LeadLog:
+    """Directory of immutable .jsonl segments, oldest first by name"""
+
+    def __init__(self, directory=LEAD_LOG_DIR, compact_threshold=COMPACT_THRESHOLD):
+        self.directory = Path(directory)
+        self.compact_threshold = compact_threshold
+        self._compact_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self, exclusive):
+        """flock on the log directory, shared between processes (and threads - one fd each)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_FILE_NAME, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def segments(self):
+        """Finished segments in write order (temp files from interrupted writes are ignored)"""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob('*.jsonl'))
+
+    def append_run(self, leads_by_region):
+        """
+        Write one run's new leads as a new segment
+        leads_by_region: {'state/county': [lead, ...]}; returns the segment path (None if empty)
+        """
+        records = [{'region': region, 'lead': lead}
+                   for region, leads in leads_by_region.items() for lead in leads]
+        if not records:
+            return None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Nanosecond time + pid keeps names unique and sortable across concurrent runs
+        path = self.directory / f"{time.time_ns():020d}-{os.getpid()}.jsonl"
+        _write_atomic(path, records)
+        print(f"🧾 Logged {len(records)} new leads to {path.name}")
+        return path
+
+    def iter_records(self):
+        """Every logged {'region', 'lead'} record, oldest first, each permit number once"""
+        # Held while reading, so a compaction can't delete a segment under us
+        with self._locked(exclusive=False):
+            seen = set()
+            for segment in self.segments():
+                with open(segment, 'r') as f:
+                    for line in f:
+                        record = json.loads(line)
+                        permit_number = record['lead'].get('permit_number', '')
+                        if permit_number in seen:
+                            continue
+                        seen.add(permit_number)
+                        yield record
+
+    def replay(self, store):
+        """
+        Re-add every logged lead to a lead store (e.g. one rebuilt from scratch)
+        Leads the store already has are left alone; returns how many were added.
+        """
+        by_region = {}
+        for record in self.iter_records():
+            by_region.setdefault(record['region'], []).append(record['lead'])
+
+        added = 0
+        for region, leads in by_region.items():
+            state, county = region.split('/')
+            added += len(store.add_leads(state, county, leads))
+        print(f"🧾 Replayed {sum(len(leads) for leads in by_region.values())} logged leads, {added} new to the store")
+        return added
+
+    # ==================== COMPACTION ====================
+
+    def compact(self):
+        """Merge every current segment into one; returns the number of segments merged"""
+        with self._compact_lock, self._locked(exclusive=True):
+            segments = self.segments()
+            if len(segments) < 2:
+                return 0
+
+            seen = set()
+            records = []
+            for segment in segments:
+                with open(segment, 'r') as f:
+                    for line in f:
+                        record = json.loads(line)
+                        permit_number = record['lead'].get('permit_number', '')
+                        if permit_number not in seen:
+                            seen.add(permit_number)
+                            records.append(record)
+
+            # Newest input's name + '~c': '~' sorts after '.', so the merged segment sorts
+            # after every input, and segments written meanwhile (later timestamp) after it
+            merged = segments[-1].with_name(segments[-1].stem + '~c.jsonl')
+            _write_atomic(merged, records)
+            for segment in segments:
+                if segment != merged:
+                    segment.unlink()
+            _fsync_dir(self.directory)
+
+            print(f"🗜️  Compacted {len(segments)} lead log segments into {merged.name} ({len(records)} leads)")
+            return len(segments)
+
+    def compact_in_background(self):
+        """Start compaction in a thread when enough segments have piled up (None otherwise)"""
+        if len(self.segments()) < self.compact_threshold:
+            return None
+        # Not a daemon - the interpreter waits for it instead of killing it mid-write
+        thread = threading.Thread(target=self.compact, name='lead-log-compactor')
+        thread.start()
+        return thread
+
+
+# Shared by the incremental scraper
+lead_log = LeadLog()
+
+
+if __name__ == '__main__':
+    import sys
+
+    if sys.argv[1:] == ['compact']:
+        lead_log.compact()
+    elif sys.argv[1:] == ['replay']:
+        from lead_store import lead_store
+        lead_log.replay(lead_store)
+    else:
+        print(f"{len(lead_log.segments())} segments in {lead_log.directory}")
+        print("Run: python lead_log.py compact | replay")
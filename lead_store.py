@@ -0,0 +1,260 @@
+"""
+Lead store - every scraped lead in one indexed SQLite table
+Replaces leads_db/current_leads.json, which every run rewrote in full
+and every reader parsed in full. permit_number is UNIQUE, so a run only
+inserts its new leads (INSERT OR IGNORE), and readers query one county,
+date range or score band through the indexes instead of loading
+everything. The full lead dict is kept as JSON next to the indexed
+columns, so readers get back exactly what the scrapers produced.
+
+Scrapers report dates in whatever format their source uses; the indexed
+date column holds them as ISO YYYY-MM-DD so they sort and filter as
+dates (the original value stays in the lead's JSON).
+
+The old JSON file is imported automatically the first time the store is
+opened (and left in place).
+"""
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+LEAD_STORE_PATH = Path(__file__).parent / 'leads_db' / 'leads.sqlite3'
+LEGACY_JSON_PATH = Path(__file__).parent / 'leads_db' / 'current_leads.json'
+
+# Permit numbers per IN (...) query - under SQLite's 999 bound-parameter limit on older builds
+MEMBERSHIP_CHUNK_SIZE = 500
+
+# Permit numbers that identify nothing (scrapers' defaults for a missing value)
+PLACEHOLDER_PERMIT_NUMBERS = {'', 'unknown', 'n/a', 'na', 'none', 'null', 'tbd'}
+
+ISO_DATE_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})([ T].*)?$')
+# US portal formats, tried in order after ISO
+DATE_FORMATS = ['%m/%d/%Y', '%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %I:%M %p',
+                '%m/%d/%Y %I:%M:%S %p', '%m/%d/%y', '%m-%d-%Y', '%B %d, %Y', '%b %d, %Y']
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS leads (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        permit_number TEXT NOT NULL UNIQUE,
+        state TEXT NOT NULL,
+        county TEXT NOT NULL,
+        date TEXT,
+        score INTEGER,
+        first_seen TEXT,
+        data TEXT NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_leads_region_date ON leads(state, county, date)',
+    'CREATE INDEX IF NOT EXISTS idx_leads_date ON leads(date)',
+    'CREATE INDEX IF NOT EXISTS idx_leads_score ON leads(score)',
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)'
+]
+
+
+def has_permit_number(lead):
+    """Whether a lead carries a real permit number - the store's identity for it"""
+    return str(lead.get('permit_number') or '').strip().lower() not in PLACEHOLDER_PERMIT_NUMBERS
+
+
+def _iso_date(value):
+    """ISO YYYY-MM-DD for a scraped date (string or epoch milliseconds), None if unrecognized"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+    value = str(value).strip()
+    match = ISO_DATE_PATTERN.match(value)
+    if match:
+        return match.group(1)
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def _row_values(state, county, lead):
+    score = lead.get('score')
+    return (
+        lead.get('permit_number', ''),
+        state,
+        county,
+        _iso_date(lead.get('date') or lead.get('issue_date')),
+        score if isinstance(score, int) else None,
+        lead.get('first_seen'),
+        json.dumps(lead)
+    )
+
+
+class LeadStore:
+    """Repository over the leads table"""
+
+    def __init__(self, path=LEAD_STORE_PATH, legacy_path=LEGACY_JSON_PATH):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    @contextmanager
+    def connect(self):
+        """Connection in a transaction (committed on success, rolled back on error)"""
+        self._ensure_schema()
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        with self._ready_lock:
+            if self._ready:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+                for statement in SCHEMA:
+                    conn.execute(statement)
+                self._migrate_json(conn)
+                self._normalize_dates(conn)
+                conn.commit()
+            finally:
+                conn.close()
+            self._ready = True
+
+    def _migrate_json(self, conn):
+        """One-time import of current_leads.json"""
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+            return
+
+        with open(self.legacy_path, 'r') as f:
+            db = json.load(f)
+        leads = [(state, county, lead)
+                 for state, counties in db.get('leads', {}).items()
+                 for county, county_leads in counties.items()
+                 for lead in county_leads]
+        rows = [_row_values(state, county, lead) for state, county, lead in leads if has_permit_number(lead)]
+        if len(rows) < len(leads):
+            print(f"⚠️  Not importing {len(leads) - len(rows)} leads without a permit number")
+        conn.executemany('''
+            INSERT OR IGNORE INTO leads (permit_number, state, county, date, score, first_seen, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_json', ?)", (str(self.legacy_path),))
+        if db.get('last_updated'):
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)", (db['last_updated'],))
+        print(f"📦 Imported {len(rows)} leads from {self.legacy_path.name} into {self.path.name}")
+
+    def _normalize_dates(self, conn):
+        """One-time rewrite of date columns stored before dates were normalized"""
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'normalized_dates'").fetchone():
+            return
+        rows = conn.execute('SELECT id, data FROM leads').fetchall()
+        conn.executemany('UPDATE leads SET date = ? WHERE id = ?',
+                         [(_iso_date(lead.get('date') or lead.get('issue_date')), row_id)
+                          for row_id, lead in ((row[0], json.loads(row[1])) for row in rows)])
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('normalized_dates', '1')")
+
+    # ==================== WRITES ====================
+
+    def add_leads(self, state, county, leads, updated_at=None):
+        """
+        Insert leads whose permit number isn't stored yet
+        Returns the leads that were actually added, in order. Leads without
+        a real permit number can't be told apart, so they are skipped (and
+        reported) instead of all collapsing into one row.
+        """
+        usable = [lead for lead in leads if has_permit_number(lead)]
+        if len(usable) < len(leads):
+            print(f"   ⚠️  {state}/{county}: skipped {len(leads) - len(usable)} leads without a permit number")
+
+        added = []
+        with self.connect() as conn:
+            for lead in usable:
+                cursor = conn.execute('''
+                    INSERT OR IGNORE INTO leads (permit_number, state, county, date, score, first_seen, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', _row_values(state, county, lead))
+                if cursor.rowcount:
+                    added.append(lead)
+            if updated_at:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)", (updated_at,))
+        return added
+
+    # ==================== READS ====================
+
+    def existing_permits(self, permit_numbers, chunk_size=MEMBERSHIP_CHUNK_SIZE):
+        """
+        Which of these permit numbers are already stored
+        Batched IN (...) lookups on the UNIQUE permit_number index: cost
+        follows the size of the batch, not of the stored history.
+        """
+        permit_numbers = list(dict.fromkeys(permit_numbers))
+        found = set()
+        with self.connect() as conn:
+            for start in range(0, len(permit_numbers), chunk_size):
+                chunk = permit_numbers[start:start + chunk_size]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(row[0] for row in conn.execute(
+                    f'SELECT permit_number FROM leads WHERE permit_number IN ({placeholders})', chunk))
+        return found
+
+    def count(self, state=None, county=None):
+        where, params = self._where(state, county)
+        with self.connect() as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM leads{where}', params).fetchone()[0]
+
+    def last_updated(self):
+        with self.connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'last_updated'").fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _where(state=None, county=None, since=None, min_score=None):
+        clauses, params = [], []
+        for column, op, value in (('state', '=', state), ('county', '=', county),
+                                  ('date', '>=', since), ('score', '>=', min_score)):
+            if value is not None:
+                clauses.append(f'{column} {op} ?')
+                params.append(value)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def query(self, state=None, county=None, since=None, min_score=None, order_by='id', limit=None):
+        """
+        Lead dicts matching the filters
+        order_by: 'id' (first seen first), 'date' or 'score' (both newest/highest first)
+        """
+        where, params = self._where(state, county, since, min_score)
+        order = {'id': 'id', 'date': 'date DESC, id', 'score': 'score DESC, id'}[order_by]
+        sql = f'SELECT data FROM leads{where} ORDER BY {order}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self.connect() as conn:
+            return [json.loads(row[0]) for row in conn.execute(sql, params)]
+
+    def leads_by_region(self, state=None, county=None, **filters):
+        """{state: {county: [lead, ...]}} - the layout current_leads.json had"""
+        where, params = self._where(state, county, filters.get('since'), filters.get('min_score'))
+        regions = {}
+        with self.connect() as conn:
+            for row in conn.execute(f'SELECT state, county, data FROM leads{where} ORDER BY id', params):
+                regions.setdefault(row[0], {}).setdefault(row[1], []).append(json.loads(row[2]))
+        return regions
+
+
+# Shared by the scrapers, the web app and the email sender
+lead_store = LeadStore()
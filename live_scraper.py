@@ -4,7 +4,7 @@ LIVE SCRAPER DEMO - Pulls REAL data from county websites
 """
 from flask import Flask, render_template, send_file, jsonify
 from datetime import datetime
-import requests
+from arcgis_client import ArcGISLayer
 from bs4 import BeautifulSoup
 import re
 import io
@@ -19,7 +19,13 @@ app.secret_key = 'demo-secret-key'
 
 # ==================== LIVE SCRAPERS ====================
 
-def scrape_nashville_live():
+NASHVILLE_LAYER = "https://maps.nashville.gov/arcgis/rest/services/Codes/BuildingPermits/MapServer/0"
+NASHVILLE_FIELDS = [
+    'CASE_NUMBER', 'LOCATION', 'CASE_TYPE_DESC', 'SUB_TYPE_DESC', 'CONSTVAL',
+    'SCOPE', 'DATE_ACCEPTED', 'STATUS_CODE', 'BLDG_SQ_FT'
+]
+
+def scrape_nashville_live(session=None):
     """Scrape REAL Nashville permit data from ArcGIS API"""
     permits = []
     try:
@@ -27,61 +33,46 @@ def scrape_nashville_live():
         
         # Nashville ArcGIS REST API - Building Permits Layer
         # This returns REAL permit data from Metro Nashville Codes Department
-        url = "https://maps.nashville.gov/arcgis/rest/services/Codes/BuildingPermits/MapServer/0/query"
-        params = {
-            'where': '1=1',  # Get all records
-            'outFields': '*',  # Get all fields
-            'returnGeometry': 'false',  # We don't need map coordinates
-            'resultRecordCount': '15',  # Limit to 15 recent permits
-            'orderByFields': 'DATE_ACCEPTED DESC',  # Most recent first
-            'f': 'json'  # JSON format
-        }
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
+        layer = ArcGISLayer(NASHVILLE_LAYER, session=session, timeout=15)
+        features = layer.query_features(
+            out_fields=NASHVILLE_FIELDS,  # Only the fields we display
+            resultRecordCount='15',  # Limit to 15 recent permits
+            orderByFields='DATE_ACCEPTED DESC'  # Most recent first
+        )
         
-        response = requests.get(url, params=params, headers=headers, timeout=15)
-        if response.status_code == 200:
-            data = response.json()
+        for attrs in features:
+            # Extract construction value (CONSTVAL)
+            const_val = attrs.get('CONSTVAL', 0)
+            if const_val is None:
+                const_val = 0
             
-            if 'features' in data:
-                for feature in data['features']:
-                    attrs = feature.get('attributes', {})
-                    
-                    # Extract construction value (CONSTVAL)
-                    const_val = attrs.get('CONSTVAL', 0)
-                    if const_val is None:
-                        const_val = 0
-                    
-                    # Convert timestamps to readable dates
-                    date_accepted = attrs.get('DATE_ACCEPTED')
-                    if date_accepted:
-                        from datetime import datetime as dt
-                        date_str = dt.fromtimestamp(date_accepted / 1000).strftime('%Y-%m-%d')
-                    else:
-                        date_str = 'N/A'
-                    
-                    permit = {
-                        'county': 'Nashville-Davidson',
-                        'permit_number': attrs.get('CASE_NUMBER', 'N/A'),
-                        'address': attrs.get('LOCATION', 'N/A'),
-                        'permit_type': attrs.get('CASE_TYPE_DESC', 'Building Permit'),
-                        'sub_type': attrs.get('SUB_TYPE_DESC', ''),
-                        'estimated_value': float(const_val),
-                        'work_description': (attrs.get('SCOPE', 'Construction project') or 'Construction project')[:200],
-                        'issue_date': date_str,
-                        'status': attrs.get('STATUS_CODE', 'N/A'),
-                        'building_sqft': attrs.get('BLDG_SQ_FT', 0) or 0,
-                        'scraped_at': datetime.now().isoformat(),
-                        'data_source': '🌐 LIVE - Nashville ArcGIS API'
-                    }
-                    permits.append(permit)
-                
-                print(f"   ✅ Found {len(permits)} REAL Nashville permits from Metro Codes")
+            # Convert timestamps to readable dates
+            date_accepted = attrs.get('DATE_ACCEPTED')
+            if date_accepted:
+                date_str = datetime.fromtimestamp(date_accepted / 1000).strftime('%Y-%m-%d')
             else:
-                print(f"   ⚠️  No features in Nashville response")
+                date_str = 'N/A'
+            
+            permit = {
+                'county': 'Nashville-Davidson',
+                'permit_number': attrs.get('CASE_NUMBER', 'N/A'),
+                'address': attrs.get('LOCATION', 'N/A'),
+                'permit_type': attrs.get('CASE_TYPE_DESC', 'Building Permit'),
+                'sub_type': attrs.get('SUB_TYPE_DESC', ''),
+                'estimated_value': float(const_val),
+                'work_description': (attrs.get('SCOPE', 'Construction project') or 'Construction project')[:200],
+                'issue_date': date_str,
+                'status': attrs.get('STATUS_CODE', 'N/A'),
+                'building_sqft': attrs.get('BLDG_SQ_FT', 0) or 0,
+                'scraped_at': datetime.now().isoformat(),
+                'data_source': '🌐 LIVE - Nashville ArcGIS API'
+            }
+            permits.append(permit)
+        
+        if permits:
+            print(f"   ✅ Found {len(permits)} REAL Nashville permits from Metro Codes")
         else:
-            print(f"   ❌ Nashville API returned {response.status_code}")
+            print(f"   ⚠️  No features in Nashville response")
     except Exception as e:
         print(f"   ❌ Error scraping Nashville: {e}")
     
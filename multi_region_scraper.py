@@ -5,7 +5,7 @@ Covers 10 major metro areas across Tennessee and Texas
 """
 from flask import Flask, render_template_string, jsonify, send_file
 from datetime import datetime
-import requests
+from http_client import get_session
 import random
 import io
 from reportlab.lib.pagesizes import letter
@@ -13,6 +13,14 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet
+from fetch_engine import FetchEngine, FetchJob, DEFAULT_DEADLINE
+from socrata_client import SocrataClient
+from arcgis_client import ArcGISLayer
+from csv_stream import iter_csv_response
+from http_cache import validator_cache
+from permit_filters import PermitFilter
+from resilience import CircuitOpenError
+from source_registry import SourceRegistry
 
 app = Flask(__name__)
 app.secret_key = 'multi-region-secret-key'
@@ -62,65 +70,74 @@ METRO_AREAS = {
     }
 }
 
+# County adapters register below by (state, county); counties without one use scrape_generic_county
+SOURCES = SourceRegistry()
+
 # ==================== TENNESSEE SCRAPERS ====================
 
-def scrape_nashville_davidson():
+# What each live source should return (pushed down where the source has the field)
+# Exact: a substring match on 'Residential' would also take 'Non-Residential' permits
+CHATTANOOGA_FILTER = PermitFilter(classes=['Residential'], class_match='exact')
+AUSTIN_FILTER = PermitFilter(classes=['Residential'], class_match='exact')
+SAN_ANTONIO_FILTER = PermitFilter(classes=['building', 'commercial', 'residential', 'mep', 'trade', 'repair'])
+
+NASHVILLE_LAYER = "https://maps.nashville.gov/arcgis/rest/services/Codes/BuildingPermits/MapServer/0"
+NASHVILLE_FIELDS = [
+    'CASE_NUMBER', 'LOCATION', 'CASE_TYPE_DESC', 'SUB_TYPE_DESC', 'CONSTVAL',
+    'SCOPE', 'DATE_ACCEPTED', 'STATUS_CODE', 'BLDG_SQ_FT'
+]
+
+@SOURCES.register('TN', 'Davidson', name='Nashville/Davidson', host='maps.nashville.gov',
+                  cost=2, latency=4.0, cadence='realtime', capabilities=('live', 'arcgis'))
+def scrape_nashville_davidson(session=None):
     """Nashville-Davidson County - REAL DATA from ArcGIS"""
     permits = []
     try:
         print("🕷️  Scraping Nashville-Davidson County (LIVE DATA - ArcGIS)...")
         
-        url = "https://maps.nashville.gov/arcgis/rest/services/Codes/BuildingPermits/MapServer/0/query"
-        params = {
-            'where': '1=1',
-            'outFields': '*',
-            'returnGeometry': 'false',
-            'resultRecordCount': '20',
-            'orderByFields': 'DATE_ACCEPTED DESC',
-            'f': 'json'
-        }
+        # Only the fields we map, as pbf when the server supports it
+        layer = ArcGISLayer(NASHVILLE_LAYER, session=session, timeout=15)
+        features = layer.query_features(
+            out_fields=NASHVILLE_FIELDS,
+            resultRecordCount='20',
+            orderByFields='DATE_ACCEPTED DESC'
+        )
         
-        response = requests.get(url, params=params, timeout=15)
-        if response.status_code == 200:
-            data = response.json()
+        for attrs in features:
+            const_val = attrs.get('CONSTVAL', 0) or 0
             
-            if 'features' in data:
-                for feature in data['features']:
-                    attrs = feature.get('attributes', {})
-                    const_val = attrs.get('CONSTVAL', 0) or 0
-                    
-                    date_accepted = attrs.get('DATE_ACCEPTED')
-                    if date_accepted:
-                        date_str = datetime.fromtimestamp(date_accepted / 1000).strftime('%Y-%m-%d')
-                    else:
-                        date_str = 'N/A'
-                    
-                    permit = {
-                        'metro': 'Nashville',
-                        'county': 'Davidson',
-                        'state': 'TN',
-                        'permit_number': attrs.get('CASE_NUMBER', 'N/A'),
-                        'address': attrs.get('LOCATION', 'N/A'),
-                        'permit_type': attrs.get('CASE_TYPE_DESC', 'Building Permit'),
-                        'sub_type': attrs.get('SUB_TYPE_DESC', ''),
-                        'estimated_value': float(const_val),
-                        'work_description': (attrs.get('SCOPE', 'Construction project') or 'Construction project')[:200],
-                        'issue_date': date_str,
-                        'status': attrs.get('STATUS_CODE', 'N/A'),
-                        'building_sqft': attrs.get('BLDG_SQ_FT', 0) or 0,
-                        'scraped_at': datetime.now().isoformat(),
-                        'data_source': '🌐 LIVE - Nashville ArcGIS API'
-                    }
-                    permits.append(permit)
-                
-                print(f"   ✅ Found {len(permits)} REAL Nashville-Davidson permits")
-        else:
-            print(f"   ❌ Nashville API error: {response.status_code}")
+            date_accepted = attrs.get('DATE_ACCEPTED')
+            if date_accepted:
+                date_str = datetime.fromtimestamp(date_accepted / 1000).strftime('%Y-%m-%d')
+            else:
+                date_str = 'N/A'
+            
+            permit = {
+                'metro': 'Nashville',
+                'county': 'Davidson',
+                'state': 'TN',
+                'permit_number': attrs.get('CASE_NUMBER', 'N/A'),
+                'address': attrs.get('LOCATION', 'N/A'),
+                'permit_type': attrs.get('CASE_TYPE_DESC', 'Building Permit'),
+                'sub_type': attrs.get('SUB_TYPE_DESC', ''),
+                'estimated_value': float(const_val),
+                'work_description': (attrs.get('SCOPE', 'Construction project') or 'Construction project')[:200],
+                'issue_date': date_str,
+                'status': attrs.get('STATUS_CODE', 'N/A'),
+                'building_sqft': attrs.get('BLDG_SQ_FT', 0) or 0,
+                'scraped_at': datetime.now().isoformat(),
+                'data_source': '🌐 LIVE - Nashville ArcGIS API'
+            }
+            permits.append(permit)
+        
+        print(f"   ✅ Found {len(permits)} REAL Nashville-Davidson permits")
     except Exception as e:
         print(f"   ❌ Nashville error: {e}")
     
     return permits
 
+@SOURCES.register('TN', 'Shelby', name='Memphis/Shelby', cost=0, latency=0.1,
+                  cadence='static', capabilities=('demo',))
 def scrape_memphis_shelby():
     """Memphis-Shelby County - Research for real API"""
     permits = []
@@ -151,7 +168,9 @@ def scrape_memphis_shelby():
     
     return permits
 
-def scrape_chattanooga_hamilton():
+@SOURCES.register('TN', 'Hamilton', name='Chattanooga/Hamilton', host='www.chattadata.org',
+                  cost=1, latency=6.0, cadence='daily', capabilities=('live', 'socrata', 'pushdown'))
+def scrape_chattanooga_hamilton(session=None):
     """Chattanooga-Hamilton County - REAL DATA from ChattaData Socrata API"""
     permits = []
     try:
@@ -159,16 +178,12 @@ def scrape_chattanooga_hamilton():
         
         # ChattaData Open Data Portal: https://www.chattadata.org/
         # Dataset: All Permit Data (764y-vxm2)
-        url = "https://www.chattadata.org/resource/764y-vxm2.json"
-        params = {
-            '$limit': '20',
-            '$order': 'applieddate DESC',
-            '$where': "permittype='Residential' OR permitclass LIKE '%Residential%'"
-        }
-        
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        client = SocrataClient('www.chattadata.org', '764y-vxm2', session=session, timeout=15)
+        data = client.iter_rows(
+            where=CHATTANOOGA_FILTER.to_soql_where({'class': ['permittype', 'permitclass']}),
+            page_size=20,
+            max_rows=20
+        )
         
         for record in data:
             # Extract project cost
@@ -202,6 +217,9 @@ def scrape_chattanooga_hamilton():
             permits.append(permit)
         
         print(f"   ✅ Found {len(permits)} REAL Chattanooga-Hamilton permits from API")
+    except CircuitOpenError as e:
+        # Known to be down - skip it rather than padding the run with demo permits
+        print(f"   ⏭️  Skipping Chattanooga: {e}")
     except Exception as e:
         print(f"   ❌ Chattanooga API error: {e}")
         print(f"   Falling back to demo data...")
@@ -224,6 +242,8 @@ def scrape_chattanooga_hamilton():
     
     return permits
 
+@SOURCES.register('TN', 'Knox', name='Knoxville/Knox', cost=0, latency=0.1,
+                  cadence='static', capabilities=('demo',))
 def scrape_knoxville_knox():
     """Knoxville-Knox County - Research for real API"""
     permits = []
@@ -254,6 +274,8 @@ def scrape_knoxville_knox():
 
 # ==================== TEXAS SCRAPERS ====================
 
+@SOURCES.register('TX', 'Dallas', name='Dallas/Dallas', cost=0, latency=0.1,
+                  cadence='static', capabilities=('demo',))
 def scrape_dallas_county():
     """Dallas County - Has open data portal"""
     permits = []
@@ -284,6 +306,8 @@ def scrape_dallas_county():
     
     return permits
 
+@SOURCES.register('TX', 'Harris', name='Houston/Harris', cost=0, latency=0.1,
+                  cadence='static', capabilities=('demo',))
 def scrape_houston_harris():
     """Houston-Harris County - Research for real API"""
     permits = []
@@ -312,7 +336,9 @@ def scrape_houston_harris():
     
     return permits
 
-def scrape_san_antonio_bexar():
+@SOURCES.register('TX', 'Bexar', name='San Antonio/Bexar', host='data.sanantonio.gov',
+                  cost=5, latency=20.0, cadence='daily', capabilities=('live', 'csv', 'conditional'))
+def scrape_san_antonio_bexar(session=None):
     """San Antonio-Bexar County - REAL DATA from OpenGov CSV"""
     permits = []
     try:
@@ -321,47 +347,48 @@ def scrape_san_antonio_bexar():
         # San Antonio OpenGov CSV - Direct download
         csv_url = 'https://data.sanantonio.gov/dataset/05012dcb-ba1b-4ade-b5f3-7403bc7f52eb/resource/fbb7202e-c6c1-475b-849e-c5c2cfb65833/download/accelasubmitpermitsextract.csv'
         
-        response = requests.get(csv_url, timeout=30)
-        response.raise_for_status()
-        
-        # Parse CSV
-        import csv
-        from io import StringIO
-        
-        csv_data = StringIO(response.text)
-        reader = csv.DictReader(csv_data)
-        
-        count = 0
-        for row in reader:
-            # Filter for building permits only (not garage sales, signs, etc.)
-            permit_type = row.get('PERMIT TYPE', '')
-            if not any(keyword in permit_type.lower() for keyword in ['building', 'commercial', 'residential', 'mep', 'trade', 'repair']):
-                continue
+        # Conditional GET - a 304 means the city hasn't republished the extract
+        with validator_cache.get(csv_url, 'multi_region', session=session, stream=True, timeout=30) as response:
+            if validator_cache.not_modified(response):
+                permits = validator_cache.payload(csv_url, 'multi_region')
+                print(f"   ♻️  Extract unchanged since last run, reusing {len(permits)} parsed permits")
+                return permits
+            response.raise_for_status()
             
-            # Map CSV columns to our format
-            permit = {
-                'metro': 'San Antonio',
-                'county': 'Bexar',
-                'state': 'TX',
-                'permit_number': row.get('PERMIT #', ''),
-                'address': row.get('ADDRESS', ''),
-                'permit_type': permit_type,
-                'estimated_value': int(float(row.get('DECLARED VALUATION', 0) or 0)),
-                'work_description': row.get('WORK TYPE', ''),
-                'owner_name': row.get('PRIMARY CONTACT', ''),
-                'project_name': row.get('PROJECT NAME', ''),
-                'issue_date': row.get('DATE ISSUED', ''),
-                'applied_date': row.get('DATE SUBMITTED', ''),
-                'area_sf': row.get('AREA (SF)', ''),
-                'scraped_at': datetime.now().isoformat(),
-                'data_source': '✅ LIVE - San Antonio OpenGov CSV'
-            }
-            permits.append(permit)
-            count += 1
-            
-            # Limit to 50 permits per scrape to keep response size manageable
-            if count >= 50:
-                break
+            # Stream rows as they download - leaving the loop early drops the connection
+            count = 0
+            for row in iter_csv_response(response):
+                # Filter for building permits only (not garage sales, signs, etc.)
+                permit_type = row.get('PERMIT TYPE', '')
+                if not SAN_ANTONIO_FILTER.matches(permit_class=permit_type):
+                    continue
+                
+                # Map CSV columns to our format
+                permit = {
+                    'metro': 'San Antonio',
+                    'county': 'Bexar',
+                    'state': 'TX',
+                    'permit_number': row.get('PERMIT #', ''),
+                    'address': row.get('ADDRESS', ''),
+                    'permit_type': permit_type,
+                    'estimated_value': int(float(row.get('DECLARED VALUATION', 0) or 0)),
+                    'work_description': row.get('WORK TYPE', ''),
+                    'owner_name': row.get('PRIMARY CONTACT', ''),
+                    'project_name': row.get('PROJECT NAME', ''),
+                    'issue_date': row.get('DATE ISSUED', ''),
+                    'applied_date': row.get('DATE SUBMITTED', ''),
+                    'area_sf': row.get('AREA (SF)', ''),
+                    'scraped_at': datetime.now().isoformat(),
+                    'data_source': '✅ LIVE - San Antonio OpenGov CSV'
+                }
+                permits.append(permit)
+                count += 1
+                
+                # Limit to 50 permits per scrape to keep response size manageable
+                if count >= 50:
+                    break
+        
+        validator_cache.store(csv_url, 'multi_region', response, permits)
         
         print(f"   ✅ Scraped {len(permits)} REAL San Antonio-Bexar building permits")
     except Exception as e:
@@ -369,7 +396,9 @@ def scrape_san_antonio_bexar():
     
     return permits
 
-def scrape_austin_travis():
+@SOURCES.register('TX', 'Travis', name='Austin/Travis', host='data.austintexas.gov',
+                  cost=1, latency=3.0, cadence='daily', capabilities=('live', 'socrata', 'pushdown'))
+def scrape_austin_travis(session=None):
     """Austin-Travis County - REAL DATA from Socrata API"""
     permits = []
     try:
@@ -377,16 +406,12 @@ def scrape_austin_travis():
         
         # Austin Open Data Portal: https://data.austintexas.gov/
         # Dataset: Issued Construction Permits (3syk-w9eu)
-        url = "https://data.austintexas.gov/resource/3syk-w9eu.json"
-        params = {
-            '$limit': '20',
-            '$order': 'applieddate DESC',
-            '$where': "permit_class_mapped='Residential'"  # Focus on residential
-        }
-        
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        client = SocrataClient('data.austintexas.gov', '3syk-w9eu', session=session, timeout=15)
+        data = client.iter_rows(
+            where=AUSTIN_FILTER.to_soql_where({'class': 'permit_class_mapped'}),  # Focus on residential
+            page_size=20,
+            max_rows=20
+        )
         
         for record in data:
             # Extract construction value if available
@@ -467,10 +492,62 @@ def scrape_generic_county(metro, county, state):
 
 # ==================== ORCHESTRATOR ====================
 
-def scrape_all_regions(selected_metros=None):
-    """Scrape all selected metro areas"""
-    all_permits = []
+# Concurrency caps for real upstream portals (demo sources are uncapped)
+HOST_LIMITS = {
+    'maps.nashville.gov': 2,
+    'www.chattadata.org': 2,
+    'data.austintexas.gov': 2,
+    'data.sanantonio.gov': 1
+}
+
+def build_scrape_jobs(selected_metros, session=None, deadline=None):
+    """
+    Build one fetch job per metro/county
+    Registered adapters go through SOURCES.plan(), which drops sources
+    with an open circuit or that can't finish inside the deadline and
+    puts the slowest first; generic counties follow.
+    """
+    session = session or get_session()
+    
+    counties = []
+    for metro in selected_metros:
+        if metro not in METRO_AREAS:
+            continue
+        state = METRO_AREAS[metro]['state']
+        for county in METRO_AREAS[metro]['counties']:
+            counties.append((metro, county, state))
+    
+    registered = {}
+    generic = []
+    for metro, county, state in counties:
+        source = SOURCES.get(state, county)
+        if source:
+            registered[source] = f"{metro}/{county}"
+        else:
+            generic.append(FetchJob(f"{metro}/{county}", scrape_generic_county, (metro, county, state)))
     
+    jobs = []
+    for source in SOURCES.plan(registered, deadline=deadline, session=session):
+        jobs.append(FetchJob(registered[source], source.call, kwargs={'session': session}, host=source.host))
+    
+    return jobs + generic
+
+def iter_regions(selected_metros=None, deadline=DEFAULT_DEADLINE, session=None):
+    """Scrape all selected metro areas concurrently, yielding (job, permits) as each source finishes"""
+    if selected_metros is None:
+        selected_metros = list(METRO_AREAS.keys())
+    
+    engine = FetchEngine(host_limits=HOST_LIMITS, deadline=deadline)
+    
+    for job, permits, error in engine.run(build_scrape_jobs(selected_metros, session, deadline)):
+        if error:
+            print(f"   ❌ {job.name} failed after {job.elapsed:.1f}s: {error}")
+            continue
+        print(f"   ⏱️  {job.name}: {len(permits)} permits in {job.elapsed:.1f}s")
+        yield job, permits
+
+def scrape_all_regions(selected_metros=None, deadline=DEFAULT_DEADLINE, session=None):
+    """Scrape all selected metro areas"""
     if selected_metros is None:
         selected_metros = list(METRO_AREAS.keys())
     
@@ -480,43 +557,15 @@ def scrape_all_regions(selected_metros=None):
     print(f"📍 Targeting {len(selected_metros)} metro areas")
     print("="*70)
     
+    # Sources finish in any order - keep the output grouped by metro/county
+    results = {}
+    for job, permits in iter_regions(selected_metros, deadline=deadline, session=session):
+        results[job.name] = permits
+    
+    all_permits = []
     for metro in selected_metros:
-        if metro not in METRO_AREAS:
-            continue
-            
-        metro_config = METRO_AREAS[metro]
-        print(f"\n🏙️  {metro}, {metro_config['state']} - {metro_config['description']}")
-        print("-" * 70)
-        
-        # Primary county (usually has best data)
-        primary_county = metro_config['counties'][0]
-        
-        # Route to appropriate scraper
-        if metro == 'Nashville' and primary_county == 'Davidson':
-            permits = scrape_nashville_davidson()
-        elif metro == 'Memphis' and primary_county == 'Shelby':
-            permits = scrape_memphis_shelby()
-        elif metro == 'Chattanooga' and primary_county == 'Hamilton':
-            permits = scrape_chattanooga_hamilton()
-        elif metro == 'Knoxville' and primary_county == 'Knox':
-            permits = scrape_knoxville_knox()
-        elif metro == 'Dallas' and primary_county == 'Dallas':
-            permits = scrape_dallas_county()
-        elif metro == 'Houston' and primary_county == 'Harris':
-            permits = scrape_houston_harris()
-        elif metro == 'San Antonio' and primary_county == 'Bexar':
-            permits = scrape_san_antonio_bexar()
-        elif metro == 'Austin' and primary_county == 'Travis':
-            permits = scrape_austin_travis()
-        else:
-            permits = scrape_generic_county(metro, primary_county, metro_config['state'])
-        
-        all_permits.extend(permits)
-        
-        # Scrape secondary counties with generic scraper
-        for county in metro_config['counties'][1:]:
-            permits = scrape_generic_county(metro, county, metro_config['state'])
-            all_permits.extend(permits)
+        for county in METRO_AREAS.get(metro, {}).get('counties', []):
+            all_permits.extend(results.get(f"{metro}/{county}", []))
     
     print("\n" + "="*70)
     print(f"📊 TOTAL PERMITS COLLECTED: {len(all_permits)}")
@@ -1,39 +1,35 @@
 #!/usr/bin/env python3
 """
-FIXED Nashville Scraper - Gets 1000 recent permits without pagination
-Key discovery: orderByFields without resultRecordCount works!
+FIXED Nashville Scraper - Gets every permit from the last 30 days
+Key discovery: resultOffset paging is broken on this layer, but
+returnIdsOnly + parallel objectIds chunks gets past the 1000-record cap
 """
 
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
+from arcgis_client import ArcGISLayer
+from permit_filters import PermitFilter
 
-def scrape_nashville_davidson():
-    """Nashville-Davidson County - FIXED VERSION - Gets 1000 recent permits"""
+NASHVILLE_LAYER = "https://maps.nashville.gov/arcgis/rest/services/Codes/BuildingPermits/MapServer/0"
+NASHVILLE_FIELDS = [
+    'CASE_NUMBER', 'LOCATION', 'CASE_TYPE_DESC', 'SUB_TYPE_DESC', 'CONSTVAL',
+    'SCOPE', 'DATE_ACCEPTED', 'APN', 'UNITS', 'BLDG_SQ_FT'
+]
+NASHVILLE_FILTER = PermitFilter(days=30)
+NASHVILLE_FILTER_FIELDS = {'date': 'DATE_ACCEPTED', 'class': 'CASE_TYPE_DESC', 'value': 'CONSTVAL'}
+
+def scrape_nashville_davidson(session=None):
+    """Nashville-Davidson County - FIXED VERSION - Gets all permits from the last 30 days"""
     permits = []
     try:
-        print("🕷️  Scraping Nashville-Davidson County (FIXED - 1000 recent permits)...")
-        
-        url = "https://maps.nashville.gov/arcgis/rest/services/Codes/BuildingPermits/MapServer/0/query"
+        print("🕷️  Scraping Nashville-Davidson County (FIXED - full 30-day pull)...")
         
-        # THE FIX: Use orderByFields WITHOUT resultRecordCount or resultOffset
-        # This returns 1000 most recent permits (vs broken pagination)
-        params = {
-            'where': '1=1',  # No date filter needed - we get recent via orderBy
-            'outFields': '*',
-            'returnGeometry': 'false',
-            'orderByFields': 'DATE_ACCEPTED DESC',  # Sort by date, gets recent first
-            'f': 'json'
-        }
+        layer = ArcGISLayer(NASHVILLE_LAYER, session=session, timeout=30)
         
-        print("   📡 Making API request...")
-        response = requests.get(url, params=params, timeout=30)
-        
-        if response.status_code != 200:
-            print(f"   ❌ HTTP {response.status_code}")
-            return permits
+        # Filter to last 30 days on the server, then pull features in objectIds chunks
+        where = NASHVILLE_FILTER.to_arcgis_where(NASHVILLE_FILTER_FIELDS)
         
-        data = response.json()
-        features = data.get('features', [])
+        print("   📡 Making API requests...")
+        features = list(layer.iter_features(where=where, out_fields=NASHVILLE_FIELDS))
         
         if not features:
             print("   ⚠️  No records returned")
@@ -41,13 +37,9 @@ def scrape_nashville_davidson():
         
         print(f"   ✅ Got {len(features)} total permits")
         
-        # Filter to last 30 days
-        thirty_days_ago = datetime.now() - timedelta(days=30)
         recent_count = 0
         
-        for feature in features:
-            attrs = feature.get('attributes', {})
-            
+        for attrs in features:
             # Check date
             date_accepted = attrs.get('DATE_ACCEPTED')
             if not date_accepted:
@@ -55,10 +47,6 @@ def scrape_nashville_davidson():
             
             permit_date = datetime.fromtimestamp(date_accepted / 1000)
             
-            # Only keep last 30 days
-            if permit_date < thirty_days_ago:
-                continue
-            
             recent_count += 1
             date_str = permit_date.strftime('%Y-%m-%d')
             
@@ -82,7 +70,6 @@ def scrape_nashville_davidson():
             permits.append(permit)
         
         print(f"   🔍 Found {recent_count} Nashville permits from last 30 days")
-        print(f"   📅 Date range: {len(features)} total permits spanning ~103 days")
         
     except Exception as e:
         print(f"   ❌ Nashville error: {e}")
@@ -0,0 +1,119 @@
+"""
+Declarative permit filters with server-side pushdown
+Each source declares what it wants (date window, permit classes, value
+floor) once. The filter is translated into the source's own query
+language (ArcGIS where / SoQL $where) for every criterion the source has
+a field for; only the rest is checked locally, row by row.
+"""
+from datetime import datetime, timedelta, timezone
+
+
+def _quote(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class PermitFilter:
+    """What a source should return: recent, of the right class, worth enough"""
+
+    def __init__(self, days=None, classes=None, min_value=None, class_match='contains'):
+        self.days = days
+        self.classes = list(classes or [])
+        self.min_value = min_value
+        self.class_match = class_match  # 'contains' (case-insensitive) or 'exact'
+
+    def __repr__(self):
+        return f"PermitFilter(days={self.days}, classes={self.classes}, min_value={self.min_value})"
+
+    def since(self, tz=None):
+        """Start of the date window (naive local time, or in tz when given)"""
+        if self.days is None:
+            return None
+        now = datetime.now(tz).replace(tzinfo=None) if tz else datetime.now()
+        return now - timedelta(days=self.days)
+
+    # ==================== PUSHDOWN ====================
+
+    def split(self, fields):
+        """
+        Split into (pushed, local) filters
+        fields: {'date': ..., 'class': ... (name or list of names), 'value': ...}
+        naming the source fields each criterion can be pushed down to
+        """
+        pushed = PermitFilter(class_match=self.class_match)
+        local = PermitFilter(class_match=self.class_match)
+
+        target = pushed if fields.get('date') else local
+        target.days = self.days
+        target = pushed if fields.get('class') else local
+        target.classes = self.classes
+        target = pushed if fields.get('value') else local
+        target.min_value = self.min_value
+        return pushed, local
+
+    def _clauses(self, fields, date_literal, upper, like, tz=None):
+        clauses = []
+
+        if self.days is not None:
+            clauses.append(f"{fields['date']} >= {date_literal(self.since(tz))}")
+
+        if self.classes:
+            class_fields = fields['class']
+            if isinstance(class_fields, str):
+                class_fields = [class_fields]
+            options = []
+            for field in class_fields:
+                for permit_class in self.classes:
+                    if self.class_match == 'exact':
+                        options.append(f"{field} = {_quote(permit_class)}")
+                    else:
+                        options.append(f"{upper}({field}) {like} {_quote('%' + permit_class.upper() + '%')}")
+            clauses.append('(' + ' OR '.join(options) + ')')
+
+        if self.min_value is not None:
+            clauses.append(f"{fields['value']} >= {self.min_value}")
+
+        return clauses
+
+    def to_arcgis_where(self, fields):
+        """ArcGIS REST where clause (standardized SQL; dates are UTC, like the layer's epoch values)"""
+        clauses = self._clauses(
+            fields,
+            lambda since: f"TIMESTAMP '{since.strftime('%Y-%m-%d %H:%M:%S')}'",
+            'UPPER', 'LIKE',
+            tz=timezone.utc
+        )
+        return ' AND '.join(clauses) or '1=1'
+
+    def to_soql_where(self, fields):
+        """Socrata SoQL $where clause (None when there's nothing to filter)"""
+        clauses = self._clauses(
+            fields,
+            lambda since: f"'{since.strftime('%Y-%m-%dT%H:%M:%S')}'",
+            'upper', 'like'
+        )
+        return ' AND '.join(clauses) or None
+
+    # ==================== LOCAL FALLBACK ====================
+
+    def matches(self, date=None, permit_class=None, value=None):
+        """Check one row locally - values the row doesn't have don't reject it"""
+        if self.days is not None and date is not None and date < self.since():
+            return False
+
+        if self.classes and permit_class is not None:
+            if self.class_match == 'exact':
+                if permit_class not in self.classes:
+                    return False
+            elif not any(c.lower() in permit_class.lower() for c in self.classes):
+                return False
+
+        if self.min_value is not None and value is not None and value < self.min_value:
+            return False
+
+        return True
+
+
+def combine_where(*clauses):
+    """AND together where clauses, skipping empty / match-all ones"""
+    parts = [f"({clause})" for clause in clauses if clause and clause != '1=1']
+    return ' AND '.join(parts) or None
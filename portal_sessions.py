@@ -0,0 +1,214 @@
+"""
+Persisted, shared authenticated sessions for vendor permit portals
+A portal's cookies and headers come from a browser cURL export once;
+after that the session (including cookies the portal rotates) is saved
+per portal and reused across runs. Before reuse it is checked with a
+cheap probe (HEAD, no redirects), and the cURL file is only re-read when
+the saved session has expired or the file was replaced. Scrapes of the
+same portal in one process share one session object.
+"""
+import json
+import os
+import shlex
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+from requests.cookies import create_cookie
+from http_client import PooledSession
+
+SESSION_DIR = Path(__file__).parent / 'leads_db' / 'portal_sessions'
+PROBE_INTERVAL = 600  # seconds a successful probe is trusted
+
+# Headers copied from a browser that must not be replayed on other requests
+SKIPPED_HEADERS = {'content-length', 'content-type', 'host', 'cookie', 'accept-encoding'}
+
+
+def parse_curl(command):
+    """(url, headers, cookies) from a 'Copy as cURL (bash)' command"""
+    # Line continuations would otherwise become literal backslash tokens
+    tokens = shlex.split(command.replace('\\\n', ' '))
+    url = None
+    headers = {}
+    cookies = {}
+
+    def add_cookies(value):
+        for cookie in value.split(';'):
+            if '=' in cookie:
+                name, cookie_value = cookie.strip().split('=', 1)
+                cookies[name] = cookie_value
+
+    tokens = iter(tokens[1:] if tokens and tokens[0] == 'curl' else tokens)
+    for token in tokens:
+        if token in ('-H', '--header'):
+            name, _, value = next(tokens, '').partition(':')
+            if name.strip().lower() == 'cookie':
+                add_cookies(value)
+            elif name.strip().lower() not in SKIPPED_HEADERS:
+                headers[name.strip()] = value.strip()
+        elif token in ('-b', '--cookie'):
+            add_cookies(next(tokens, ''))
+        elif token in ('-X', '--request', '-d', '--data', '--data-raw', '--data-binary', '-A', '--user-agent'):
+            value = next(tokens, '')
+            if token in ('-A', '--user-agent'):
+                headers['User-Agent'] = value
+        elif token == '--url':
+            url = next(tokens, None)
+        elif not token.startswith('-') and url is None:
+            url = token
+
+    return url, headers, cookies
+
+
+class PortalSessionStore:
+    """portal name -> one authenticated session, persisted as JSON"""
+
+    def __init__(self, directory=SESSION_DIR, probe_interval=PROBE_INTERVAL):
+        self.directory = Path(directory)
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._portal_locks = {}
+        self._sessions = {}
+
+    def _path(self, portal):
+        return self.directory / f"{portal}.json"
+
+    def _portal_lock(self, portal):
+        with self._lock:
+            return self._portal_locks.setdefault(portal, threading.Lock())
+
+    # ==================== PERSISTENCE ====================
+
+    def _load(self, portal):
+        try:
+            with open(self._path(portal), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, portal):
+        """Persist the portal's current cookies (servers rotate them) and headers"""
+        entry = self._sessions.get(portal)
+        if entry is None:
+            return
+        session = entry['session']
+        state = {
+            'probe_url': entry['probe_url'],
+            'curl_mtime': entry['curl_mtime'],
+            'validated_at': entry['validated_at'],
+            'headers': entry['headers'],
+            'cookies': [{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path,
+                         'secure': c.secure, 'expires': c.expires} for c in session.cookies]
+        }
+        # Live login cookies - readable by the owner only
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = self._path(portal).with_suffix('.json.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self._path(portal))
+
+    @staticmethod
+    def _build(headers, cookies, domain=''):
+        # Own pooled session - portal cookies/headers must not leak into the shared client
+        session = PooledSession()
+        session.headers.update(headers)
+        for cookie in cookies:
+            if isinstance(cookie, dict):
+                session.cookies.set_cookie(create_cookie(**cookie))
+            else:
+                name, value = cookie
+                session.cookies.set_cookie(create_cookie(name, value, domain=domain))
+        return session
+
+    # ==================== VALIDATION ====================
+
+    @staticmethod
+    def probe(session, url):
+        """Whether the portal still treats the session as logged in (no redirect to a login page)"""
+        try:
+            response = session.head(url, allow_redirects=False, timeout=10)
+            if response.status_code == 405:
+                response = session.get(url, allow_redirects=False, stream=True, timeout=10)
+                response.close()
+        except Exception as e:
+            print(f"   ⚠️  Session probe failed: {e}")
+            return False
+        return response.status_code < 300
+
+    def _validated(self, entry):
+        if time.time() - entry['validated_at'] < self.probe_interval:
+            return True
+        if not entry['probe_url'] or self.probe(entry['session'], entry['probe_url']):
+            entry['validated_at'] = time.time()
+            return True
+        return False
+
+    # ==================== SESSIONS ====================
+
+    def get(self, portal, curl_file, probe_url=None):
+        """
+        Authenticated session for a portal, or None when there are no valid credentials
+        Order: the in-process session, the persisted one, then the cURL file.
+        Concurrent callers for one portal wait for a single authentication.
+        """
+        curl_file = Path(curl_file)
+        curl_mtime = curl_file.stat().st_mtime if curl_file.exists() else None
+
+        with self._portal_lock(portal):
+            entry = self._sessions.get(portal)
+
+            if entry is None:
+                saved = self._load(portal)
+                # A newer cURL export means the user logged in again
+                if saved and (curl_mtime is None or saved['curl_mtime'] == curl_mtime):
+                    entry = {
+                        'session': self._build(saved['headers'], saved['cookies']),
+                        'headers': saved['headers'],
+                        'probe_url': probe_url or saved['probe_url'],
+                        'curl_mtime': saved['curl_mtime'],
+                        'validated_at': saved['validated_at']
+                    }
+
+            if entry is not None and entry['curl_mtime'] == curl_mtime and self._validated(entry):
+                self._sessions[portal] = entry
+                self.save(portal)
+                return entry['session']
+
+            if curl_mtime is None:
+                self._sessions.pop(portal, None)
+                return None
+
+            # Expired (or never loaded) - rebuild from the cURL export
+            with open(curl_file, 'r') as f:
+                url, headers, cookies = parse_curl(f.read())
+            domain = urlsplit(url).hostname if url else ''
+            entry = {
+                'session': self._build(headers, cookies.items(), domain),
+                'headers': headers,
+                'probe_url': probe_url or url,
+                'curl_mtime': curl_mtime,
+                'validated_at': 0
+            }
+            if not self._validated(entry):
+                print(f"   🔒 {portal}: saved cURL session has expired - export a fresh one to {curl_file}")
+                self._sessions.pop(portal, None)
+                return None
+
+            print(f"   🔑 {portal}: loaded {len(cookies)} cookies, {len(headers)} headers from {curl_file.name}")
+            self._sessions[portal] = entry
+            self.save(portal)
+            return entry['session']
+
+    def invalidate(self, portal):
+        """Forget a session the portal rejected mid-scrape (next get() re-probes the cURL file)"""
+        with self._portal_lock(portal):
+            self._sessions.pop(portal, None)
+            try:
+                self._path(portal).unlink()
+            except FileNotFoundError:
+                pass
+
+
+# Shared by every portal scraper in the process
+portal_sessions = PortalSessionStore()
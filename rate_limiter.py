@@ -0,0 +1,141 @@
+"""
+Cross-process token-bucket rate limits per upstream host
+The nightly scheduler, the cron scraper and the /scrape endpoints can
+all hit the same Socrata or ArcGIS host at once. Their buckets live in
+one SQLite file, so the combined request rate stays under each host's
+limit no matter how many threads or processes are scraping. A 429/503
+with Retry-After blocks the host for everyone until it has passed.
+
+Each request takes a token (going negative reserves a future slot), so
+a caller does one short transaction and then sleeps exactly as long as
+it has to.
+"""
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+RATE_LIMIT_DB_PATH = Path(__file__).parent / 'leads_db' / 'rate_limits.sqlite3'
+MAX_RETRY_AFTER = 300  # seconds - never honor a longer block than this
+
+
+class HostRate:
+    """Sustained requests per second, and how many may go at once after a quiet spell"""
+
+    def __init__(self, per_second, burst=None):
+        self.per_second = per_second
+        self.burst = burst or max(1, int(per_second * 2))
+
+
+# Keyed by host. Hosts not listed are unthrottled, but still honor Retry-After.
+HOST_RATES = {
+    'maps.nashville.gov': HostRate(8),
+    'data.chattlibrary.org': HostRate(4),
+    'www.chattadata.org': HostRate(4),
+    'data.austintexas.gov': HostRate(4),
+    'data.sanantonio.gov': HostRate(2)
+}
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0), MAX_RETRY_AFTER)
+
+
+class RateLimiter:
+    """host -> token bucket, shared across threads and processes through SQLite"""
+
+    def __init__(self, path=RATE_LIMIT_DB_PATH, rates=None):
+        self.path = Path(path)
+        self.rates = HOST_RATES if rates is None else rates
+        self._local = threading.local()
+
+    def _connect(self):
+        # One connection per thread; transactions are opened explicitly
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS buckets (
+                    host TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0
+                )
+            ''')
+            self._local.conn = conn
+        return conn
+
+    def reserve(self, host):
+        """Take a token for one request to host; returns the seconds to wait before sending it"""
+        rate = self.rates.get(host)
+        conn = self._connect()
+
+        if rate is None:
+            row = conn.execute('SELECT blocked_until FROM buckets WHERE host = ?', (host,)).fetchone()
+            return max(0.0, row[0] - time.time()) if row else 0.0
+
+        # IMMEDIATE takes the write lock up front, so read-refill-write can't interleave
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute('SELECT tokens, updated_at, blocked_until FROM buckets WHERE host = ?',
+                               (host,)).fetchone()
+            tokens, updated_at, blocked_until = row if row else (rate.burst, now, 0.0)
+            tokens = min(rate.burst, tokens + (now - updated_at) * rate.per_second) - 1
+            conn.execute('INSERT OR REPLACE INTO buckets (host, tokens, updated_at, blocked_until) VALUES (?, ?, ?, ?)',
+                         (host, tokens, now, blocked_until))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        wait = -tokens / rate.per_second if tokens < 0 else 0.0
+        return max(wait, blocked_until - now)
+
+    def acquire(self, host):
+        """Block until a request to host may be sent"""
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    def block(self, host, seconds):
+        """Hold every process's requests to host for the next `seconds` (from Retry-After)"""
+        rate = self.rates.get(host)
+        until = time.time() + seconds
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('''
+                INSERT INTO buckets (host, tokens, updated_at, blocked_until) VALUES (?, ?, ?, ?)
+                ON CONFLICT(host) DO UPDATE SET blocked_until = MAX(blocked_until, excluded.blocked_until)
+            ''', (host, rate.burst if rate else 0, time.time(), until))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        print(f"   🚦 {host} asked us to back off for {seconds:.0f}s")
+
+    def observe(self, host, response):
+        """Honor a throttling response's Retry-After"""
+        if response.status_code in (429, 503):
+            seconds = parse_retry_after(response.headers.get('Retry-After'))
+            if seconds:
+                self.block(host, seconds)
+
+
+# Shared by every session in the process (and, through the file, every process)
+rate_limiter = RateLimiter()
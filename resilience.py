@@ -0,0 +1,276 @@
+"""
+Per-source resilience for upstream HTTP calls
+Retries idempotent requests with jittered exponential backoff, hedges
+slow GETs with a second copy, and trips a per-source circuit breaker
+after repeated failures. Breaker state is persisted between runs, so a
+city portal that was down at 6am is skipped at noon until its cooldown
+has passed instead of stalling every run on its timeouts.
+
+The state file is shared by the cron scraper, the scheduler and the web
+app: every update re-reads it and writes it back under an flock, so one
+process never overwrites another's entries. Once a cooldown is over,
+only one caller (across all processes) gets the half-open trial call.
+"""
+import fcntl
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+from pathlib import Path
+import requests
+
+BREAKER_STATE_PATH = Path(__file__).parent / 'leads_db' / 'circuit_breakers.json'
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Seconds a half-open trial call may take before another caller gets to try
+TRIAL_TIMEOUT = 120
+
+
+class SourcePolicy:
+    """How hard to try one source before giving up on it"""
+
+    def __init__(self, retries=2, backoff_base=0.5, backoff_cap=8.0, hedge_after=None,
+                 failure_threshold=3, cooldown=600):
+        self.retries = retries                      # extra attempts for idempotent requests
+        self.backoff_base = backoff_base            # seconds, doubled per attempt
+        self.backoff_cap = backoff_cap
+        self.hedge_after = hedge_after              # seconds before a duplicate GET is raced (None = off)
+        self.failure_threshold = failure_threshold  # consecutive failed calls that open the circuit
+        self.cooldown = cooldown                    # seconds the circuit stays open
+
+
+DEFAULT_POLICY = SourcePolicy()
+
+# Keyed by host. Portals with a long tail of slow responses get hedged.
+SOURCE_POLICIES = {
+    'maps.nashville.gov': SourcePolicy(hedge_after=4.0),
+    'data.chattlibrary.org': SourcePolicy(hedge_after=6.0),
+    'www.chattadata.org': SourcePolicy(hedge_after=6.0),
+    'data.austintexas.gov': SourcePolicy(hedge_after=4.0),
+    'data.sanantonio.gov': SourcePolicy(retries=1)  # one big CSV - never hedged (streamed)
+}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a source whose circuit is open"""
+
+
+def backoff_delay(attempt, base, cap):
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# ==================== CIRCUIT BREAKERS ====================
+
+class CircuitBreakers:
+    """Consecutive-failure breakers per source, persisted as JSON shared between processes"""
+
+    def __init__(self, path=BREAKER_STATE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._state = {}
+        self._mtime = None
+
+    def _read(self):
+        """Current state, re-read from disk only when another writer changed the file"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._state, self._mtime = {}, None
+            return self._state
+        if mtime != self._mtime:
+            try:
+                with open(self.path, 'r') as f:
+                    self._state = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._state = {}
+            self._mtime = mtime
+        return self._state
+
+    def _save(self):
+        tmp_path = self.path.with_suffix(f'.json.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    @contextmanager
+    def _update(self):
+        """Fresh state to modify, written back before any other process can update it"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path.with_suffix('.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._mtime = None  # always merge with what other processes wrote
+                    yield self._read()
+                    self._save()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _entry(self, source):
+        with self._lock:
+            return self._read().get(source)
+
+    def state(self, source, policy=DEFAULT_POLICY):
+        """'closed', 'open' or 'half-open' (cooldown over, next call is a trial)"""
+        entry = self._entry(source)
+        if not entry or entry.get('opened_at') is None:
+            return 'closed'
+        if time.time() - entry['opened_at'] < policy.cooldown:
+            return 'open'
+        return 'half-open'
+
+    def check(self, source, policy=DEFAULT_POLICY):
+        """
+        Raise CircuitOpenError if the source is still cooling down
+        When half-open, the first caller is let through as the trial and
+        everyone else keeps getting CircuitOpenError until it reports back.
+        """
+        state = self.state(source, policy)
+        if state == 'closed':
+            return
+        if state == 'open':
+            retry_at = time.strftime('%H:%M:%S', time.localtime(self._entry(source)['opened_at'] + policy.cooldown))
+            raise CircuitOpenError(f"circuit open for {source} (retrying after {retry_at})")
+
+        with self._update() as breakers:
+            entry = breakers.get(source)
+            if entry and entry.get('opened_at') is not None:
+                trial_started = entry.get('trial_started')
+                if trial_started is not None and time.time() - trial_started < TRIAL_TIMEOUT:
+                    raise CircuitOpenError(f"circuit half-open for {source} (trial call in progress)")
+                entry['trial_started'] = time.time()
+
+    def record_success(self, source):
+        # Nothing to write for a healthy source (the common case)
+        if self._entry(source) is None:
+            return
+        with self._update() as breakers:
+            breakers.pop(source, None)
+
+    def record_failure(self, source, policy=DEFAULT_POLICY):
+        with self._update() as breakers:
+            entry = breakers.setdefault(source, {'failures': 0, 'opened_at': None})
+            entry['failures'] += 1
+            entry.pop('trial_started', None)
+            if entry['failures'] >= policy.failure_threshold:
+                # Also re-opens a half-open circuit whose trial call failed
+                if entry['opened_at'] is None:
+                    print(f"   🔌 Circuit opened for {source} after {entry['failures']} failures")
+                entry['opened_at'] = time.time()
+
+
+# Shared by every session in the process
+circuit_breakers = CircuitBreakers()
+
+
+# ==================== HEDGING ====================
+
+# Every hedged GET sends its attempts from this pool, so it has to fit every
+# caller at once - FetchEngine's workers times the ArcGIS/Accela page pools
+# under them, two attempts each - or requests would queue for a thread.
+# Idle threads are reused and new ones only start on demand, so the ceiling
+# costs nothing until that many requests are actually in flight.
+HEDGE_POOL_SIZE = 256
+
+_hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_POOL_SIZE, thread_name_prefix='hedge')
+
+
+def _close_late(future):
+    """Release the connection held by a hedge that lost the race"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def hedged(send, hedge_after, before_send=None):
+    """
+    Call send(); if it hasn't answered within hedge_after seconds, race a
+    second identical call and return whichever succeeds first
+    The clock starts when the first call is actually sent - time queued
+    for a pool worker or spent in before_send (rate-limit waits) doesn't
+    count toward hedge_after.
+    """
+    started = threading.Event()
+
+    def attempt(signal=None):
+        try:
+            if before_send is not None:
+                before_send()
+        finally:
+            if signal is not None:
+                signal.set()
+        return send()
+
+    first = _hedge_pool.submit(attempt, started)
+    started.wait()
+    try:
+        return first.result(timeout=hedge_after)
+    except FutureTimeout:
+        pass
+
+    second = _hedge_pool.submit(attempt)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.add_done_callback(_close_late)
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+# ==================== CALLS ====================
+
+def _send_once(send, before_send):
+    if before_send is not None:
+        before_send()
+    return send()
+
+
+def call_with_resilience(source, method, send, policy=None, breakers=circuit_breakers, hedge=True,
+                         before_send=None):
+    """
+    Run send() (one HTTP request returning a response) under the source's policy
+    Only idempotent methods are retried or hedged. Connection errors,
+    timeouts and 429/5xx count as failures; any other response means the
+    source is up. before_send() runs ahead of every attempt (e.g. to wait
+    for a rate-limit token).
+    """
+    policy = policy or SOURCE_POLICIES.get(source, DEFAULT_POLICY)
+    breakers.check(source, policy)
+
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    attempts = 1 + (policy.retries if idempotent else 0)
+    use_hedge = hedge and idempotent and policy.hedge_after is not None
+
+    for attempt in range(attempts):
+        last_try = attempt == attempts - 1
+        try:
+            if use_hedge:
+                response = hedged(send, policy.hedge_after, before_send)
+            else:
+                response = _send_once(send, before_send)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last_try:
+                breakers.record_failure(source, policy)
+                raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS:
+                breakers.record_success(source)
+                return response
+            if last_try:
+                # Hand the error response back - callers raise_for_status() as before
+                breakers.record_failure(source, policy)
+                return response
+            response.close()
+
+        time.sleep(backoff_delay(attempt, policy.backoff_base, policy.backoff_cap))
@@ -34,30 +34,33 @@ class LeadScheduler:
                 print(f"Already scraped today ({today_str}). Skipping.")
                 return
             
-            # Step 1: Scrape permits from all counties
+            # Steps 1-2: Scrape all counties in parallel; score and save each
+            # county as soon as it arrives while slower ones are still fetching
             print("Step 1: Scraping permits...")
-            permits = self.scraper.scrape_all()
+            batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+            scored_permits = []
+            
+            for scraper, permits in self.scraper.iter_results():
+                if not permits:
+                    continue
+                print(f"\nStep 2: Scoring and saving {len(permits)} {scraper.county_name} permits...")
+                county_scored = self.scorer.score_batch(permits)
+                self.firebase.save_permits(county_scored, batch_id)
+                scored_permits.extend(county_scored)
             
-            if not permits:
+            if not scored_permits:
                 print("No permits found. Exiting.")
                 return
             
-            # Step 2: Score permits with AI
-            print(f"\nStep 2: Scoring {len(permits)} permits with AI...")
-            scored_permits = self.scorer.score_batch(permits)
-            
-            # Step 3: Get top 10 leads
+            # Step 3: Get top 10 leads across every county
+            scored_permits.sort(key=lambda x: x['score'], reverse=True)
             top_leads = scored_permits[:10]
             print(f"\nStep 3: Top 10 leads identified")
             for i, lead in enumerate(top_leads, 1):
                 print(f"  {i}. {lead['county']} - Score: {lead['score']}")
             
-            # Step 4: Save to Firebase
-            print("\nStep 4: Saving permits to database...")
-            batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-            self.firebase.save_permits(scored_permits, batch_id)
-            
-            # Save daily leads
+            # Step 4: Save daily leads
+            print("\nStep 4: Saving daily leads...")
             date_str = datetime.now().strftime('%Y-%m-%d')
             self.firebase.save_daily_leads(date_str, top_leads)
             
@@ -0,0 +1,188 @@
+"""
+Async base scraper class for county permit websites
+Same contract as PermitScraper, but page and PDF downloads are awaited on
+a shared httpx.AsyncClient, so the orchestrator can run every county in
+one event loop instead of one blocking request at a time.
+"""
+import asyncio
+import os
+from abc import abstractmethod
+from typing import Any, Awaitable, Callable, List, Dict
+from urllib.parse import urlparse
+import httpx
+import lxml.html
+from bs4 import BeautifulSoup
+from http_client import USER_AGENT, DEFAULT_TIMEOUT
+from resilience import circuit_breakers, SOURCE_POLICIES, DEFAULT_POLICY
+from rate_limiter import rate_limiter
+import http_replay
+from .base_scraper import PermitScraper, HTML_PARSER, DETAIL_CONCURRENCY, DETAIL_TIMEOUT
+from .link_cache import link_cache
+
+
+def create_async_client() -> httpx.AsyncClient:
+    """AsyncClient with the same defaults as the shared requests session"""
+    kwargs = {}
+    replay_mode = os.getenv('HTTP_REPLAY_MODE')
+    if replay_mode:
+        kwargs['transport'] = http_replay.async_transport(replay_mode)
+    return httpx.AsyncClient(
+        headers={'User-Agent': USER_AGENT},
+        timeout=DEFAULT_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        **kwargs
+    )
+
+
+class AsyncPermitScraper(PermitScraper):
+    """Base class for county scrapers whose I/O runs on an event loop"""
+    
+    def __init__(self, county_name: str, base_url: str, session=None):
+        super().__init__(county_name, base_url, session)
+        self.client = None  # httpx.AsyncClient while a scrape is running
+    
+    @abstractmethod
+    async def scrape_async(self) -> List[Dict]:
+        """
+        Scrape permits from county website (uses self.client)
+        Returns list of permit dictionaries
+        """
+        pass
+    
+    async def run_async(self, client: httpx.AsyncClient) -> List[Dict]:
+        """Run scrape_async on a client owned by the caller"""
+        self.client = client
+        try:
+            return await self.scrape_async()
+        finally:
+            self.client = None
+    
+    def scrape(self) -> List[Dict]:
+        """Synchronous entry point - runs the scrape on its own loop and client"""
+        async def run():
+            async with create_async_client() as client:
+                return await self.run_async(client)
+        return asyncio.run(run())
+    
+    async def fetch(self, url: str) -> httpx.Response:
+        """
+        GET a page through the per-host circuit breaker and rate limit
+        Both keep their state on disk, so they run in a worker thread
+        instead of blocking the loop. Replayed traffic skips them, like
+        the shared session does in replay mode.
+        """
+        if os.getenv('HTTP_REPLAY_MODE') == 'replay':
+            response = await self.client.get(url)
+            response.raise_for_status()
+            return response
+        
+        host = urlparse(url).hostname
+        policy = SOURCE_POLICIES.get(host, DEFAULT_POLICY)
+        await asyncio.to_thread(circuit_breakers.check, host, policy)
+        await asyncio.sleep(await asyncio.to_thread(rate_limiter.reserve, host))
+        try:
+            response = await self.client.get(url)
+        except httpx.TransportError:
+            await asyncio.to_thread(circuit_breakers.record_failure, host, policy)
+            raise
+        await asyncio.to_thread(rate_limiter.observe, host, response)
+        if response.status_code >= 500:
+            await asyncio.to_thread(circuit_breakers.record_failure, host, policy)
+        else:
+            await asyncio.to_thread(circuit_breakers.record_success, host)
+        response.raise_for_status()
+        return response
+    
+    async def fetch_many(self, items: List[Any], worker: Callable[[Any], Awaitable[Any]],
+                         concurrency: int = DETAIL_CONCURRENCY, timeout: float = DETAIL_TIMEOUT) -> List[Any]:
+        """
+        Await worker(item) for many detail pages at once, at most `concurrency` in flight
+        Results come back in item order; an item that fails or runs past
+        `timeout` seconds (counted once it gets a slot) gives None.
+        """
+        slots = asyncio.Semaphore(concurrency)
+        
+        async def run(item):
+            async with slots:
+                try:
+                    return await asyncio.wait_for(worker(item), timeout)
+                except asyncio.TimeoutError:
+                    print(f"   ⏱️  {self.county_name}: {item} timed out after {timeout}s")
+                except Exception as e:
+                    print(f"   ❌ {self.county_name}: {item} failed: {e}")
+                return None
+        
+        return await asyncio.gather(*(run(item) for item in items))
+    
+    async def find_todays_permits_link(self, refresh: bool = False) -> str:
+        """Dynamically find the 'today's permits' link on the homepage (cached between runs)"""
+        if not refresh:
+            cached_url, stale = link_cache.get(self.county_name)
+            if cached_url and (not stale or await self.revalidate_link(cached_url)):
+                return cached_url
+        
+        try:
+            soup = await self.parse_html(self.base_url)
+            if not soup:
+                return None
+            return self.remember_link(self.pick_permits_link(soup))
+        except Exception as e:
+            print(f"Error finding today's permits link for {self.county_name}: {e}")
+            return None
+    
+    async def revalidate_link(self, url: str) -> bool:
+        """HEAD a cached link past its TTL - only a 404/410 sends us back to the homepage"""
+        try:
+            response = await self.client.head(url, timeout=15)
+            gone = response.status_code in (404, 410)
+        except Exception:
+            gone = False  # can't tell - the page fetch will find out
+        if gone:
+            link_cache.invalidate(self.county_name)
+            return False
+        link_cache.mark_valid(self.county_name)
+        return True
+    
+    async def load_permits_page(self):
+        """(url, page) for the permits page, rediscovering once if the cached link broke"""
+        url = await self.find_todays_permits_link()
+        if not url:
+            return None, None
+        page = await self.parse_listing(url)
+        if page is not None and self.looks_like_permits_page(page):
+            return url, page
+        
+        print(f"🔍 {self.county_name}: {url} no longer looks like a permits page, rediscovering")
+        link_cache.invalidate(self.county_name)
+        fresh_url = await self.find_todays_permits_link(refresh=True)
+        if not fresh_url or fresh_url == url:
+            return url, page
+        return fresh_url, await self.parse_listing(fresh_url)
+    
+    async def parse_html(self, url: str) -> BeautifulSoup:
+        """Fetch and parse HTML page"""
+        try:
+            response = await self.fetch(url)
+            return BeautifulSoup(response.content, HTML_PARSER)
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+    
+    async def parse_listing(self, url: str):
+        """Fetch a permits listing page as an lxml tree (see PermitScraper.parse_listing)"""
+        try:
+            response = await self.fetch(url)
+            return lxml.html.fromstring(response.content)
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+    
+    async def parse_pdf(self, pdf_url: str) -> str:
+        """Download a PDF and extract its text (off the event loop)"""
+        try:
+            response = await self.fetch(pdf_url)
+            return await asyncio.to_thread(self.extract_pdf_text, response.content)
+        except Exception as e:
+            print(f"Error parsing PDF {pdf_url}: {e}")
+            return ""
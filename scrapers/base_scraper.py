@@ -1,96 +1,161 @@
 """
 Base scraper class for county permit websites
 """
-import requests
 from bs4 import BeautifulSoup
+import lxml.html
 from abc import ABC, abstractmethod
-from typing import List, Dict
-import pdfplumber
-import io
+from http_client import get_session
+from typing import Any, Callable, List, Dict
 from datetime import datetime
+import queue
 import re
+import threading
+import time
+from .link_cache import link_cache
+from . import pdf_extractor
+
+# BeautifulSoup on lxml's C parser - several times faster than html.parser
+HTML_PARSER = 'lxml'
+
+# Links on a permits listing that point at individual permits
+PERMIT_LINK_PATTERN = re.compile(r'permit|application|pdf')
+
+# Detail pages fetched at once per scraper, and how long each one gets
+DETAIL_CONCURRENCY = 6
+DETAIL_TIMEOUT = 30
+
+# Header text (lowercase, punctuation stripped) -> permit field
+PERMIT_COLUMNS = {
+    'permit_number': ('permit', 'permit no', 'permit number', 'permit num', 'case number', 'record number', 'application number'),
+    'address': ('address', 'location', 'site address', 'property address', 'project address'),
+    'permit_type': ('type', 'permit type', 'record type', 'work type', 'work class', 'category'),
+    'work_description': ('description', 'work description', 'scope', 'project description'),
+    'estimated_value': ('value', 'valuation', 'job value', 'estimated value', 'declared valuation', 'cost', 'project cost'),
+    'issue_date': ('date', 'issue date', 'issued', 'date issued', 'issued date'),
+    'contractor': ('contractor', 'contractor name', 'applicant'),
+    'owner': ('owner', 'owner name', 'property owner')
+}
+HEADER_TO_FIELD = {alias: field for field, aliases in PERMIT_COLUMNS.items() for alias in aliases}
+
+# Tables without recognisable headers: Permit #, Address, Type, Value, Date
+POSITIONAL_COLUMNS = {'permit_number': 0, 'address': 1, 'permit_type': 2, 'estimated_value': 3, 'issue_date': 4}
 
 
 class PermitScraper(ABC):
     """Base class for all county permit scrapers"""
     
-    def __init__(self, county_name: str, base_url: str):
+    def __init__(self, county_name: str, base_url: str, session=None):
         self.county_name = county_name
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
+        # Shared pooled client (keep-alive, default timeout, browser User-Agent)
+        self.session = session or get_session()
     
-    def find_todays_permits_link(self) -> str:
+    def find_todays_permits_link(self, refresh: bool = False) -> str:
         """
         Dynamically find the 'today's permits' link on the homepage
-        Returns the full URL to the permits page
+        Returns the full URL to the permits page. A link found on an
+        earlier run is reused (see link_cache) unless refresh is set.
         """
+        if not refresh:
+            cached_url, stale = link_cache.get(self.county_name)
+            if cached_url and (not stale or self.revalidate_link(cached_url)):
+                return cached_url
+        
         try:
             soup = self.parse_html(self.base_url)
             if not soup:
                 return None
+            return self.remember_link(self.pick_permits_link(soup))
             
-            # Look for links containing keywords related to today's/daily permits
-            keywords = ['today', 'daily', 'issued', 'new', 'permit', 'report']
+        except Exception as e:
+            print(f"Error finding today's permits link for {self.county_name}: {e}")
+            return None
+    
+    def revalidate_link(self, url: str) -> bool:
+        """HEAD a cached link past its TTL - only a 404/410 sends us back to the homepage"""
+        try:
+            response = self.session.head(url, timeout=15, allow_redirects=True)
+            gone = response.status_code in (404, 410)
+        except Exception:
+            gone = False  # can't tell - the page fetch will find out
+        if gone:
+            link_cache.invalidate(self.county_name)
+            return False
+        link_cache.mark_valid(self.county_name)
+        return True
+    
+    def remember_link(self, url: str) -> str:
+        if url:
+            link_cache.store(self.county_name, url)
+        return url
+    
+    def load_permits_page(self):
+        """
+        (url, page) for the permits page, page being a parsed listing (see parse_listing)
+        A cached link that fails to load or no longer looks like a permits
+        page is dropped and discovery runs again, once.
+        """
+        url = self.find_todays_permits_link()
+        if not url:
+            return None, None
+        page = self.parse_listing(url)
+        if page is not None and self.looks_like_permits_page(page):
+            return url, page
+        
+        print(f"🔍 {self.county_name}: {url} no longer looks like a permits page, rediscovering")
+        link_cache.invalidate(self.county_name)
+        fresh_url = self.find_todays_permits_link(refresh=True)
+        if not fresh_url or fresh_url == url:
+            return url, page
+        return fresh_url, self.parse_listing(fresh_url)
+    
+    def looks_like_permits_page(self, page) -> bool:
+        """Whether a listing has anything to extract permits from"""
+        return next(page.iter('table'), None) is not None or bool(self.permit_links(page))
+    
+    def _absolute_url(self, href: str) -> str:
+        """Convert relative URLs to absolute"""
+        if href.startswith('http'):
+            return href
+        elif href.startswith('//'):
+            # Protocol-relative URL
+            return f"https:{href}"
+        elif href.startswith('/'):
+            return f"{self.base_url.rstrip('/')}{href}"
+        else:
+            # Relative URL without leading slash
+            return f"{self.base_url.rstrip('/')}/{href}"
+    
+    def pick_permits_link(self, soup: BeautifulSoup) -> str:
+        """Choose the permits link on a parsed homepage (shared by the sync and async scrapers)"""
+        # Look for links containing keywords related to today's/daily permits
+        keywords = ['today', 'daily', 'issued', 'new', 'permit', 'report']
+        fallback = None
+        
+        # One pass over the links: a keyword in the link text wins outright,
+        # the first 'permit'/'report' href is kept as the fallback
+        for link in soup.find_all('a', href=True):
+            href = link.get('href')
+            link_text = link.get_text().lower()
             
-            for link in soup.find_all('a', href=True):
-                link_text = link.get_text().lower()
-                href = link.get('href')
-                
-                # Check if link text contains any of our keywords
-                if any(keyword in link_text for keyword in keywords):
-                    # Convert relative URLs to absolute
-                    if href.startswith('http'):
-                        print(f"🔍 {self.county_name}: Found potential permits link: {href}")
-                        return href
-                    elif href.startswith('//'):
-                        # Protocol-relative URL
-                        full_url = f"https:{href}"
-                        print(f"🔍 {self.county_name}: Found potential permits link: {full_url}")
-                        return full_url
-                    elif href.startswith('/'):
-                        full_url = f"{self.base_url.rstrip('/')}{href}"
-                        print(f"🔍 {self.county_name}: Found potential permits link: {full_url}")
-                        return full_url
-                    else:
-                        # Relative URL without leading slash
-                        full_url = f"{self.base_url.rstrip('/')}/{href}"
-                        print(f"🔍 {self.county_name}: Found potential permits link: {full_url}")
-                        return full_url
+            if any(keyword in link_text for keyword in keywords):
+                full_url = self._absolute_url(href)
+                print(f"🔍 {self.county_name}: Found potential permits link: {full_url}")
+                return full_url
             
-            # If no direct link found, try searching for text patterns in the page
+            if fallback is None and ('permit' in href.lower() or 'report' in href.lower()):
+                fallback = href
+        
+        # If no direct link found, use the fallback when the page talks about permits at all
+        if fallback is not None:
             page_text = soup.get_text().lower()
             if any(keyword in page_text for keyword in keywords):
-                # Look for any link that might be related
-                for link in soup.find_all('a', href=True):
-                    href = link.get('href')
-                    if 'permit' in href.lower() or 'report' in href.lower():
-                        if href.startswith('http'):
-                            print(f"🔍 {self.county_name}: Found fallback permits link: {href}")
-                            return href
-                        elif href.startswith('//'):
-                            # Protocol-relative URL
-                            full_url = f"https:{href}"
-                            print(f"🔍 {self.county_name}: Found fallback permits link: {full_url}")
-                            return full_url
-                        elif href.startswith('/'):
-                            full_url = f"{self.base_url.rstrip('/')}{href}"
-                            print(f"🔍 {self.county_name}: Found fallback permits link: {full_url}")
-                            return full_url
-                        else:
-                            # Relative URL without leading slash
-                            full_url = f"{self.base_url.rstrip('/')}/{href}"
-                            print(f"🔍 {self.county_name}: Found fallback permits link: {full_url}")
-                            return full_url
-            
-            print(f"🔍 {self.county_name}: No permits links found on homepage")
-            return None
-            
-        except Exception as e:
-            print(f"Error finding today's permits link for {self.county_name}: {e}")
-            return None
+                full_url = self._absolute_url(fallback)
+                print(f"🔍 {self.county_name}: Found fallback permits link: {full_url}")
+                return full_url
+        
+        print(f"🔍 {self.county_name}: No permits links found on homepage")
+        return None
     
     @abstractmethod
     def scrape(self) -> List[Dict]:
@@ -105,7 +170,7 @@ class PermitScraper(ABC):
         try:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            return BeautifulSoup(response.content, HTML_PARSER)
         except Exception as e:
             print(f"Error fetching {url}: {e}")
             return None
@@ -116,15 +181,124 @@ class PermitScraper(ABC):
             response = self.session.get(pdf_url, timeout=30)
             response.raise_for_status()
             
-            with pdfplumber.open(io.BytesIO(response.content)) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() + "\n"
-                return text
+            return self.extract_pdf_text(response.content)
         except Exception as e:
             print(f"Error parsing PDF {pdf_url}: {e}")
             return ""
     
+    def fetch_many(self, items: List[Any], worker: Callable[[Any], Any],
+                   concurrency: int = DETAIL_CONCURRENCY, timeout: float = DETAIL_TIMEOUT) -> List[Any]:
+        """
+        Run worker(item) for many detail pages at once, at most `concurrency` in flight
+        Results come back in item order. An item that fails or runs past
+        `timeout` seconds (counted from when it started) gives None. A hung
+        item's thread is abandoned and its slot goes to the next item, so
+        hung pages can't hold up the rest of the batch.
+        """
+        results = [None] * len(items)
+        finished = queue.Queue()
+        pending = iter(enumerate(items))
+        deadlines = {}  # index -> when the running item times out
+        
+        def run(index, item):
+            try:
+                finished.put((index, worker(item), None))
+            except Exception as e:
+                finished.put((index, None, e))
+        
+        def start_next():
+            next_item = next(pending, None)
+            if next_item is not None:
+                deadlines[next_item[0]] = time.monotonic() + timeout
+                # Daemon - an abandoned thread must not keep the process alive
+                threading.Thread(target=run, args=next_item, daemon=True).start()
+        
+        for _ in range(max(1, concurrency)):
+            start_next()
+        
+        while deadlines:
+            try:
+                index, result, error = finished.get(timeout=max(min(deadlines.values()) - time.monotonic(), 0))
+            except queue.Empty:
+                now = time.monotonic()
+                for index, deadline in list(deadlines.items()):
+                    if deadline <= now:
+                        print(f"   ⏱️  {self.county_name}: {items[index]} timed out after {timeout}s")
+                        del deadlines[index]
+                        start_next()
+                continue
+            
+            if deadlines.pop(index, None) is None:
+                continue  # late answer from an item that already timed out
+            if error is not None:
+                print(f"   ❌ {self.county_name}: {items[index]} failed: {error}")
+            else:
+                results[index] = result
+            start_next()
+        
+        return results
+    
+    # ==================== FAST LISTING EXTRACTION ====================
+    
+    def parse_listing(self, url: str):
+        """
+        Fetch a permits listing page as an lxml tree
+        Listings are only read for their tables and links, so they skip
+        BeautifulSoup entirely - lxml walks large tables many times faster.
+        """
+        try:
+            response = self.session.get(url, timeout=30)
+            response.raise_for_status()
+            return lxml.html.fromstring(response.content)
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+    
+    @staticmethod
+    def permit_links(page) -> List[str]:
+        """hrefs on a listing that point at individual permits, in page order"""
+        return [href for href in page.xpath('//a/@href') if PERMIT_LINK_PATTERN.search(href)]
+    
+    @staticmethod
+    def map_columns(headers: List[str]) -> Dict[str, int]:
+        """Permit field -> column index, from a table's header texts"""
+        columns = {}
+        for index, header in enumerate(headers):
+            field = HEADER_TO_FIELD.get(re.sub(r'[^a-z0-9 ]', '', header.lower()).strip())
+            if field and field not in columns:
+                columns[field] = index
+        return columns
+    
+    def iter_table_rows(self, page):
+        """
+        Yield (columns, cells) for every data row of every table on a listing
+        cells are the row's cell texts. Columns come from the table's header
+        row; tables whose headers don't name a permit number fall back to
+        fixed positions.
+        """
+        for table in page.iter('table'):
+            rows = [[' '.join(cell.text_content().split()) for cell in row if cell.tag in ('td', 'th')]
+                    for row in table.iter('tr')]
+            if len(rows) < 2:
+                continue
+            columns = self.map_columns(rows[0])
+            if 'permit_number' not in columns:
+                columns = POSITIONAL_COLUMNS
+            for cells in rows[1:]:
+                yield columns, cells
+    
+    @staticmethod
+    def cell_text(cells: List[str], columns: Dict[str, int], field: str, default: str = '') -> str:
+        index = columns.get(field)
+        if index is None or index >= len(cells):
+            return default
+        return cells[index]
+    
+    @staticmethod
+    def extract_pdf_text(content: bytes) -> str:
+        """Text of every page of a downloaded PDF (parallel, cached by content hash)"""
+        return pdf_extractor.extract_text(content)
+    
     def create_permit_dict(self, **kwargs) -> Dict:
         """Create standardized permit dictionary"""
         return {
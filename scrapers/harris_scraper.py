@@ -4,65 +4,52 @@ Harris County (Texas) permit scraper
 """
 import re
 from typing import List, Dict
-from .base_scraper import PermitScraper
+from .async_base_scraper import AsyncPermitScraper
 
 
-class HarrisScraper(PermitScraper):
+class HarrisScraper(AsyncPermitScraper):
     """Scraper for Harris County, TX building permits"""
     
-    def __init__(self):
+    def __init__(self, session=None):
         super().__init__(
             'Harris-TX',
-            'https://www.harriscountytx.gov'  # Main homepage
+            'https://www.harriscountytx.gov',  # Main homepage
+            session
         )
     
-    def scrape(self) -> List[Dict]:
+    async def scrape_async(self) -> List[Dict]:
         """
         Scrape Harris County permits
         """
         permits = []
         
         try:
-            # Find today's permits link dynamically
-            permits_url = self.find_todays_permits_link()
+            # Today's permits page - cached link, rediscovered only when it breaks
+            permits_url, page = await self.load_permits_page()
             if not permits_url:
                 print(f"No today's permits link found for {self.county_name}")
                 return permits
             
             print(f"Found permits URL: {permits_url}")
-            
-            # Parse the permits page
-            soup = self.parse_html(permits_url)
-            if not soup:
+            if page is None:
                 return permits
             
-            # Look for permit data in tables
-            tables = soup.find_all('table')
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows[1:]:  # Skip header row
-                    cols = row.find_all(['td', 'th'])
-                    if len(cols) >= 4:  # Ensure we have enough columns
-                        permit_data = self.extract_from_table_row(cols)
-                        if permit_data:
-                            permits.append(permit_data)
+            # Look for permit data in tables (columns mapped from each table's header)
+            for columns, cols in self.iter_table_rows(page):
+                permit_data = self.extract_from_table_row(cols, columns)
+                if permit_data:
+                    permits.append(permit_data)
             
             # If no table data found, try looking for permit links
             if not permits:
-                permit_links = soup.find_all('a', href=re.compile(r'permit|application|pdf'))
-                for link in permit_links[:20]:  # Limit to recent 20
-                    permit_url = link.get('href')
+                permit_urls = []
+                for permit_url in self.permit_links(page)[:20]:  # Limit to recent 20
                     if not permit_url.startswith('http'):
                         permit_url = f"{self.base_url.rstrip('/')}{permit_url}"
-                    
-                    # Check if it's a PDF
-                    if permit_url.endswith('.pdf'):
-                        pdf_text = self.parse_pdf(permit_url)
-                        permit_data = self.extract_from_pdf(pdf_text)
-                    else:
-                        permit_soup = self.parse_html(permit_url)
-                        permit_data = self.extract_from_html(permit_soup)
-                    
+                    permit_urls.append(permit_url)
+                
+                # Fetch the detail pages together (bounded, per-page timeout), keep them in link order
+                for permit_data in await self.fetch_many(permit_urls, self.scrape_detail):
                     if permit_data:
                         permits.append(permit_data)
         
@@ -71,22 +58,31 @@ class HarrisScraper(PermitScraper):
         
         return permits
     
-    def extract_from_table_row(self, cols) -> Dict:
-        """Extract permit data from table row"""
+    async def scrape_detail(self, permit_url: str) -> Dict:
+        """Extract one permit from its detail page or PDF"""
+        # Check if it's a PDF
+        if permit_url.endswith('.pdf'):
+            pdf_text = await self.parse_pdf(permit_url)
+            return self.extract_from_pdf(pdf_text)
+        permit_soup = await self.parse_html(permit_url)
+        return self.extract_from_html(permit_soup)
+    
+    def extract_from_table_row(self, cols: List[str], columns: Dict[str, int]) -> Dict:
+        """Extract permit data from a table row's cell texts (columns: field -> index)"""
         try:
-            # Assuming table columns: Permit #, Address, Type, Value, Date
-            permit_number = cols[0].get_text().strip() if len(cols) > 0 else ''
-            address = cols[1].get_text().strip() if len(cols) > 1 else ''
-            permit_type = cols[2].get_text().strip() if len(cols) > 2 else ''
-            value_text = cols[3].get_text().strip() if len(cols) > 3 else '0'
-            issue_date = cols[4].get_text().strip() if len(cols) > 4 else ''
+            permit_number = self.cell_text(cols, columns, 'permit_number')
+            if not permit_number or len(cols) < min(len(columns), 4):
+                return None  # spacer / summary row
             
             return self.create_permit_dict(
                 permit_number=permit_number,
-                address=address,
-                permit_type=permit_type,
-                estimated_value=self.parse_value(value_text),
-                issue_date=issue_date
+                address=self.cell_text(cols, columns, 'address'),
+                permit_type=self.cell_text(cols, columns, 'permit_type'),
+                work_description=self.cell_text(cols, columns, 'work_description'),
+                estimated_value=self.parse_value(self.cell_text(cols, columns, 'estimated_value', '0')),
+                issue_date=self.cell_text(cols, columns, 'issue_date'),
+                contractor=self.cell_text(cols, columns, 'contractor'),
+                owner=self.cell_text(cols, columns, 'owner')
             )
         except Exception as e:
             print(f"Error extracting from table row: {e}")
@@ -122,10 +118,8 @@ class HarrisScraper(PermitScraper):
         try:
             # Use regex to extract common fields
             permit_number = re.search(r'Permit #?:?\s*(\S+)', text)
-            address = re.search(r'Address:?\s*([^
-]+)', text)
-            permit_type = re.search(r'Type:?\s*([^
-]+)', text)
+            address = re.search(r'Address:?\s*([^\n]+)', text)
+            permit_type = re.search(r'Type:?\s*([^\n]+)', text)
             value = re.search(r'Value:?\s*$?([\d,]+)', text)
             
             return self.create_permit_dict(
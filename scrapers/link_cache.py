@@ -0,0 +1,71 @@
+"""
+Persistent cache of discovered "today's permits" links
+Discovering the link means downloading and scanning a county homepage,
+but the link itself rarely changes. Once found, the URL is reused until
+it breaks (404, or the page stops parsing as a permits page). After the
+TTL it's revalidated with a cheap HEAD request instead of rediscovered.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+LINK_CACHE_PATH = Path(__file__).parent.parent / 'leads_db' / 'discovered_links.json'
+DEFAULT_TTL = 7 * 86400  # seconds before a cached link is revalidated
+
+
+class LinkCache:
+    """county name -> {'url', 'discovered_at', 'validated_at'}"""
+    
+    def __init__(self, path=LINK_CACHE_PATH, ttl=DEFAULT_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = None
+    
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self._entries = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+    
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+    
+    def get(self, county):
+        """(url, needs_revalidation) for a county, or (None, False)"""
+        with self._lock:
+            entry = self._load().get(county)
+        if not entry:
+            return None, False
+        return entry['url'], time.time() - entry['validated_at'] > self.ttl
+    
+    def store(self, county, url):
+        now = time.time()
+        with self._lock:
+            self._load()[county] = {'url': url, 'discovered_at': now, 'validated_at': now}
+            self._save()
+    
+    def mark_valid(self, county):
+        with self._lock:
+            entry = self._load().get(county)
+            if entry:
+                entry['validated_at'] = time.time()
+                self._save()
+    
+    def invalidate(self, county):
+        with self._lock:
+            if self._load().pop(county, None) is not None:
+                self._save()
+
+
+# Shared by all county scrapers
+link_cache = LinkCache()
@@ -4,19 +4,20 @@ Nashville-Davidson County permit scraper
 """
 import re
 from typing import List, Dict
-from .base_scraper import PermitScraper
+from .async_base_scraper import AsyncPermitScraper
 
 
-class NashvilleDavidsonScraper(PermitScraper):
+class NashvilleDavidsonScraper(AsyncPermitScraper):
     """Scraper for Nashville-Davidson County building permits"""
     
-    def __init__(self):
+    def __init__(self, session=None):
         super().__init__(
             'Nashville-Davidson',
-            'https://www.nashville.gov'  # Main homepage for dynamic link finding
+            'https://www.nashville.gov',  # Main homepage for dynamic link finding
+            session
         )
     
-    def scrape(self) -> List[Dict]:
+    async def scrape_async(self) -> List[Dict]:
         """
         Scrape Nashville-Davidson permits
         Note: Nashville does not appear to publish issued permit data publicly online.
@@ -30,7 +31,7 @@ class NashvilleDavidsonScraper(PermitScraper):
         
         return permits
     
-    def extract_from_table_row(self, cols) -> Dict:
+    def extract_from_table_row(self, cols: List[str], columns: Dict[str, int]) -> Dict:
         """Extract permit data from table row"""
         # Not used since no tables with permit data exist
         return None
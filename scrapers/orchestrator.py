@@ -1,40 +1,117 @@
-
 """
 Scraper orchestrator - runs all county scrapers
 """
-from typing import List, Dict
+import asyncio
+import queue
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from .async_base_scraper import AsyncPermitScraper, create_async_client
+from .base_scraper import PermitScraper
 from .nashville_scraper import NashvilleDavidsonScraper
 from .rutherford_scraper import RutherfordScraper
 from .wilson_scraper import WilsonScraper
 from .sumner_scraper import SumnerScraper
 from .harris_scraper import HarrisScraper
 
+# Seconds one county gets before it's abandoned for this run
+DEFAULT_SCRAPER_TIMEOUT = 60
+
+_DONE = object()
+
 
 class ScraperOrchestrator:
     """Manages all county scrapers"""
     
-    def __init__(self):
+    def __init__(self, session=None, timeout: float = DEFAULT_SCRAPER_TIMEOUT):
+        self.timeout = timeout
         self.scrapers = [
-            NashvilleDavidsonScraper(),
-            RutherfordScraper(),
-            WilsonScraper(),
-            SumnerScraper(),
-            HarrisScraper()
+            NashvilleDavidsonScraper(session),
+            RutherfordScraper(session),
+            WilsonScraper(session),
+            SumnerScraper(session),
+            HarrisScraper(session)
         ]
     
-    def scrape_all(self) -> List[Dict]:
-        """Run all scrapers and collect permits"""
-        all_permits = []
+    async def _run_one(self, scraper: PermitScraper, client, timeout: float) -> Tuple[PermitScraper, List[Dict]]:
+        """One scraper under its deadline - failures and timeouts come back as no permits"""
+        print(f"Scraping {scraper.county_name}...")
+        try:
+            if isinstance(scraper, AsyncPermitScraper):
+                permits = await asyncio.wait_for(scraper.run_async(client), timeout)
+            else:
+                # Blocking scrapers get a worker thread so they don't stall the loop
+                permits = await asyncio.wait_for(asyncio.to_thread(scraper.scrape), timeout)
+            print(f"  {scraper.county_name}: found {len(permits)} permits")
+        except asyncio.TimeoutError:
+            print(f"  {scraper.county_name}: timed out after {timeout}s")
+            permits = []
+        except Exception as e:
+            print(f"  {scraper.county_name} error: {e}")
+            permits = []
+        return scraper, permits
+    
+    async def iter_results_async(self, timeout: Optional[float] = None):
+        """Yield (scraper, permits) for each county as soon as it finishes"""
+        timeout = self.timeout if timeout is None else timeout
+        async with create_async_client() as client:
+            tasks = [asyncio.ensure_future(self._run_one(scraper, client, timeout))
+                     for scraper in self.scrapers]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    def iter_results(self, timeout: Optional[float] = None) -> Iterator[Tuple[PermitScraper, List[Dict]]]:
+        """
+        Synchronous version of iter_results_async
+        The scrapers keep running on a background event loop while the
+        caller works on the counties that have already arrived.
+        """
+        results = queue.Queue()
         
-        for scraper in self.scrapers:
-            print(f"Scraping {scraper.county_name}...")
+        async def produce():
             try:
-                permits = scraper.scrape()
-                all_permits.extend(permits)
-                print(f"  Found {len(permits)} permits")
-            except Exception as e:
-                print(f"  Error: {e}")
+                async for result in self.iter_results_async(timeout):
+                    results.put(result)
+            finally:
+                results.put(_DONE)
+        
+        worker = threading.Thread(target=asyncio.run, args=(produce(),), daemon=True)
+        worker.start()
+        while True:
+            result = results.get()
+            if result is _DONE:
+                break
+            yield result
+        worker.join()
+    
+    def scrape_all(self, timeout: Optional[float] = None,
+                   on_result: Optional[Callable[[PermitScraper, List[Dict]], None]] = None) -> List[Dict]:
+        """
+        Run all scrapers in parallel and collect permits
+        on_result(scraper, permits) is called for each county as it arrives.
+        """
+        results = {}
+        for scraper, permits in self.iter_results(timeout):
+            results[scraper] = permits
+            if on_result:
+                on_result(scraper, permits)
+        return self._collect(results)
+    
+    async def scrape_all_async(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Run all scrapers together in one event loop and collect permits"""
+        results = {}
+        async for scraper, permits in self.iter_results_async(timeout):
+            results[scraper] = permits
+        return self._collect(results)
+    
+    def _collect(self, results: Dict[PermitScraper, List[Dict]]) -> List[Dict]:
+        """Flatten per-county results in scraper order"""
+        all_permits = []
+        for scraper in self.scrapers:
+            all_permits.extend(results.get(scraper, []))
         
-        print(f"
-Total permits collected: {len(all_permits)}")
+        print(f"\nTotal permits collected: {len(all_permits)}")
         return all_permits
@@ -0,0 +1,98 @@
+"""
+PDF text extraction for county permit reports
+Pages are extracted in parallel in a process pool (pdfplumber is pure
+Python and CPU-bound, so threads wouldn't help), and the text is cached
+by the PDF's content hash so an unchanged report is never parsed twice.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+import pdfplumber
+
+PDF_CACHE_DIR = Path(__file__).parent.parent / 'leads_db' / 'pdf_text_cache'
+
+# Documents shorter than this are extracted in one go - not worth the IPC
+MIN_PAGES_PER_CHUNK = 4
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pool_context():
+    # Never fork: scrapers call this from worker threads, and a forked child
+    # can inherit a lock some other thread was holding
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def get_pool():
+    """Process pool shared by every scraper (workers from a clean forkserver/spawn process)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=_pool_context())
+        return _pool
+
+
+def reset_pool():
+    """Drop a broken pool - the next document starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _extract_pages(content, start, stop):
+    """Text of pages [start, stop) - runs in a pool worker"""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return [page.extract_text() or '' for page in pdf.pages[start:stop]]
+
+
+def _cache_path(digest):
+    return PDF_CACHE_DIR / f"{digest}.txt"
+
+
+def _extract(content):
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        page_count = len(pdf.pages)
+
+    if MAX_WORKERS < 2 or page_count < 2 * MIN_PAGES_PER_CHUNK:
+        pages = _extract_pages(content, 0, page_count)
+    else:
+        chunk = max(MIN_PAGES_PER_CHUNK, -(-page_count // MAX_WORKERS))
+        try:
+            pool = get_pool()
+            futures = [pool.submit(_extract_pages, content, start, min(start + chunk, page_count))
+                       for start in range(0, page_count, chunk)]
+            pages = [text for future in futures for text in future.result()]
+        except BrokenProcessPool as e:
+            print(f"   ⚠️  PDF worker pool unavailable ({e}), extracting in-process")
+            reset_pool()
+            pages = _extract_pages(content, 0, page_count)
+
+    return ''.join(text + '\n' for text in pages)
+
+
+def extract_text(content: bytes) -> str:
+    """Text of every page of a PDF, from the cache when this exact file was seen before"""
+    digest = hashlib.sha256(content).hexdigest()
+    path = _cache_path(digest)
+    try:
+        return path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        pass
+
+    text = _extract(content)
+
+    PDF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+    return text
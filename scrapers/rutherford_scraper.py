@@ -3,19 +3,20 @@
 Rutherford County permit scraper
 """
 from typing import List, Dict
-from .base_scraper import PermitScraper
+from .async_base_scraper import AsyncPermitScraper
 
 
-class RutherfordScraper(PermitScraper):
+class RutherfordScraper(AsyncPermitScraper):
     """Scraper for Rutherford County building permits"""
     
-    def __init__(self):
+    def __init__(self, session=None):
         super().__init__(
             'Rutherford',
-            'https://rutherfordcountytn.gov'  # Main homepage
+            'https://rutherfordcountytn.gov',  # Main homepage
+            session
         )
     
-    def scrape(self) -> List[Dict]:
+    async def scrape_async(self) -> List[Dict]:
         """
         Scrape Rutherford County permits
         Note: Rutherford does not appear to publish issued permit data publicly online.
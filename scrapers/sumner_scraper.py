@@ -3,19 +3,20 @@
 Sumner County permit scraper
 """
 from typing import List, Dict
-from .base_scraper import PermitScraper
+from .async_base_scraper import AsyncPermitScraper
 
 
-class SumnerScraper(PermitScraper):
+class SumnerScraper(AsyncPermitScraper):
     """Scraper for Sumner County building permits"""
     
-    def __init__(self):
+    def __init__(self, session=None):
         super().__init__(
             'Sumner',
-            'https://sumnercountytn.gov'  # Main homepage
+            'https://sumnercountytn.gov',  # Main homepage
+            session
         )
     
-    def scrape(self) -> List[Dict]:
+    async def scrape_async(self) -> List[Dict]:
         """
         Scrape Sumner County permits
         Note: Sumner does not appear to publish issued permit data publicly online.
@@ -3,19 +3,20 @@
 Wilson County permit scraper
 """
 from typing import List, Dict
-from .base_scraper import PermitScraper
+from .async_base_scraper import AsyncPermitScraper
 
 
-class WilsonScraper(PermitScraper):
+class WilsonScraper(AsyncPermitScraper):
     """Scraper for Wilson County building permits"""
     
-    def __init__(self):
+    def __init__(self, session=None):
         super().__init__(
             'Wilson',
-            'https://www.wilsoncountytn.gov'  # Main homepage
+            'https://www.wilsoncountytn.gov',  # Main homepage
+            session
         )
     
-    def scrape(self) -> List[Dict]:
+    async def scrape_async(self) -> List[Dict]:
         """
         Scrape Wilson County permits
         Note: Wilson does not appear to publish issued permit data publicly online.
@@ -0,0 +1,134 @@
+"""
+Socrata (SODA) client with keyset pagination
+Pages on (order field, :id) instead of $offset, so deep pages stay fast
+and rows aren't skipped or repeated while the dataset is changing.
+A named walk can be checkpointed and resumed on the next run: the cursor
+is only written by commit_checkpoint(), once the caller has stored the
+rows it walked past, so a crash never skips rows nobody saved.
+"""
+import json
+import os
+from pathlib import Path
+from http_client import get_session
+
+CHECKPOINT_DIR = Path(__file__).parent / 'leads_db' / 'socrata_checkpoints'
+DEFAULT_PAGE_SIZE = 1000
+
+
+def soql_literal(value):
+    """Quote a value for use in a SoQL expression"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class SocrataClient:
+    """Reads a Socrata dataset newest-first using keyset pagination"""
+
+    def __init__(self, domain, dataset_id, order_field='applieddate', session=None, timeout=45):
+        self.url = f"https://{domain}/resource/{dataset_id}.json"
+        self.order_field = order_field
+        self.session = session or get_session()
+        self.timeout = timeout
+        self._walked = {}  # walk name -> cursor after the last page read (None once finished)
+
+    # ==================== CHECKPOINTS ====================
+
+    def checkpoint_path(self, name):
+        return CHECKPOINT_DIR / f"{name}.json"
+
+    def load_checkpoint(self, name):
+        """Load the saved cursor for a walk ({'value': ..., 'id': ...}) or None"""
+        try:
+            with open(self.checkpoint_path(name), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save_checkpoint(self, name, cursor):
+        CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+        path = self.checkpoint_path(name)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(cursor, f)
+        os.replace(tmp_path, path)
+
+    def clear_checkpoint(self, name):
+        try:
+            self.checkpoint_path(name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def commit_checkpoint(self, name):
+        """
+        Persist how far a walk got - call once its rows are stored
+        A finished walk clears the checkpoint, so the next run starts fresh.
+        """
+        if name not in self._walked:
+            return
+        cursor = self._walked.pop(name)
+        if cursor is None:
+            self.clear_checkpoint(name)
+        else:
+            self.save_checkpoint(name, cursor)
+
+    # ==================== QUERIES ====================
+
+    def keyset_where(self, where, cursor):
+        """
+        Combine a caller filter with the 'older than the last row' condition
+        Rows without an order value are left out - no keyset can page past them.
+        """
+        field = self.order_field
+        keyset = f"{field} IS NOT NULL"
+        if cursor:
+            value = soql_literal(cursor['value'])
+            row_id = soql_literal(cursor['id'])
+            keyset = f"({field} < {value} OR ({field} = {value} AND :id < {row_id}))"
+        return f"({where}) AND {keyset}" if where else keyset
+
+    def iter_rows(self, where=None, select='*', page_size=DEFAULT_PAGE_SIZE,
+                  max_rows=None, checkpoint=None):
+        """
+        Yield rows ordered by order_field DESC, :id DESC
+
+        checkpoint: optional walk name. The walk resumes from the saved
+        cursor; how far it gets is only saved by commit_checkpoint(checkpoint).
+        Finishing the walk (or stopping iteration on purpose) marks it complete.
+        """
+        cursor = self.load_checkpoint(checkpoint) if checkpoint else None
+        if cursor:
+            print(f"   ↪️  Resuming {checkpoint} from {cursor['value']}")
+
+        yielded = 0
+        try:
+            while True:
+                limit = page_size if max_rows is None else min(page_size, max_rows - yielded)
+                params = {
+                    '$select': f"{select}, :id",
+                    '$order': f"{self.order_field} DESC, :id DESC",
+                    '$limit': limit,
+                    '$where': self.keyset_where(where, cursor)
+                }
+
+                response = self.session.get(self.url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                rows = response.json()
+
+                for row in rows:
+                    yield row
+                    yielded += 1
+
+                if len(rows) < limit or (max_rows is not None and yielded >= max_rows):
+                    break
+
+                last = rows[-1]
+                cursor = {'value': last[self.order_field], 'id': last[':id']}
+                if checkpoint:
+                    self._walked[checkpoint] = cursor
+        except GeneratorExit:
+            # Caller has what it needs - this walk is complete
+            if checkpoint:
+                self._walked[checkpoint] = None
+            raise
+
+        if checkpoint:
+            self._walked[checkpoint] = None
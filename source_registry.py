@@ -0,0 +1,105 @@
+"""
+Source registry - which adapter scrapes which county
+Adapters register themselves by (state, county) with metadata the
+orchestrators plan from: upstream host, relative cost, expected latency,
+update cadence and capabilities. Dispatch, ordering and skipping come
+from this data instead of if/elif chains.
+"""
+from http_client import get_session
+from resilience import SOURCE_POLICIES, DEFAULT_POLICY
+
+
+class Source:
+    """One registered adapter and what it costs to run"""
+
+    def __init__(self, state, county, func, name=None, host=None, cost=1, latency=1.0,
+                 cadence='daily', capabilities=(), args=()):
+        self.state = state
+        self.county = county
+        self.func = func
+        self.name = name or f"{county}, {state}"
+        self.host = host                  # None = no network (demo/sample data)
+        self.cost = cost                  # relative upstream load (requests per run)
+        self.latency = latency            # expected seconds for one run
+        self.cadence = cadence            # how often upstream publishes: 'realtime', 'daily', 'weekly', 'static'
+        self.capabilities = set(capabilities)
+        self.args = args
+
+    def __repr__(self):
+        return f"Source({self.name!r}, host={self.host!r}, latency={self.latency})"
+
+    @property
+    def key(self):
+        return (self.state, self.county)
+
+    @property
+    def live(self):
+        return self.host is not None
+
+    def call(self, session=None, **context):
+        """
+        Run the adapter
+        Live adapters get the shared session; 'watermarks' adapters get
+        context['watermarks'].
+        """
+        kwargs = {}
+        if self.live:
+            kwargs['session'] = session
+        if 'watermarks' in self.capabilities:
+            kwargs['watermarks'] = context.get('watermarks')
+        return self.func(*self.args, **kwargs)
+
+
+class SourceRegistry:
+    """(state, county) -> Source"""
+
+    def __init__(self):
+        self._sources = {}
+
+    def register(self, state, county, **meta):
+        """Decorator: register the function as the adapter for a county"""
+        def decorator(func):
+            self.add(Source(state, county, func, **meta))
+            return func
+        return decorator
+
+    def add(self, source):
+        if source.key in self._sources:
+            raise ValueError(f"{source.key} already has an adapter: {self._sources[source.key]}")
+        self._sources[source.key] = source
+
+    def get(self, state, county):
+        return self._sources.get((state, county))
+
+    def __iter__(self):
+        return iter(self._sources.values())
+
+    def __len__(self):
+        return len(self._sources)
+
+    def plan(self, sources=None, deadline=None, session=None):
+        """
+        Order sources for a concurrent run and drop the ones not worth starting
+        Skips sources whose circuit is open and sources that can't finish
+        inside the deadline. The slowest start first so the run's total time
+        is bounded by its longest source, not by queueing behind it.
+        Circuits are those of the session the run will use (default: the
+        shared one); a session without breakers (replay mode) skips nothing.
+        """
+        session = session or get_session()
+        breakers = getattr(session, 'breakers', None)
+        sources = list(self if sources is None else sources)
+        planned = []
+
+        for source in sources:
+            if source.live and breakers is not None:
+                policy = SOURCE_POLICIES.get(source.host, DEFAULT_POLICY)
+                if breakers.state(source.host, policy) == 'open':
+                    print(f"   ⏭️  Skipping {source.name}: circuit open for {source.host}")
+                    continue
+            if deadline is not None and source.latency > deadline:
+                print(f"   ⏭️  Skipping {source.name}: expected {source.latency:.0f}s exceeds {deadline}s deadline")
+                continue
+            planned.append(source)
+
+        return sorted(planned, key=lambda source: source.latency, reverse=True)
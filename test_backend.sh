@@ -42,12 +42,8 @@ print(f'   ✅ Active subscriptions: {stats[\"active_subscriptions\"]}')
 echo ""
 echo "4️⃣  Checking leads..."
 python3 -c "
-import json
-with open('leads_db/current_leads.json') as f:
-    data = json.load(f)
-    leads = data.get('leads', {})
-    total = sum(len(county) for state in leads.values() for county in state.values())
-    print(f'   ✅ Total leads: {total:,}')
+from lead_store import lead_store
+print(f'   ✅ Total leads: {lead_store.count():,}')
 " || echo "   ❌ Failed to check leads"
 
 # 5. Test email simulation
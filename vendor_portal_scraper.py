@@ -16,10 +16,14 @@ import time
 import csv
 import json
 import subprocess
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-import requests
+from http_client import PooledSession
 from bs4 import BeautifulSoup
+from csv_stream import iter_csv_response
+from http_cache import validator_cache
+from accela_http import AccelaPortal
+from portal_sessions import portal_sessions
 
 # Directory for storing auth cookies
 AUTH_DIR = Path(__file__).parent / "auth_cookies"
@@ -36,11 +40,14 @@ class PermitPortalScraper:
     def __init__(self, city_name, vendor_type):
         self.city_name = city_name
         self.vendor_type = vendor_type
-        self.session = requests.Session()
+        # Own pooled session - portal cookies/headers must not leak into the shared client
+        self.session = PooledSession()
         self.curl_file = AUTH_DIR / f"{city_name}.curl"
+        # Cheap page that redirects to login once the session expires (default: the cURL URL)
+        self.probe_url = None
         
     def load_auth_from_curl(self):
-        """Parse cURL command to extract cookies and headers"""
+        """Authenticated session for this portal (persisted; cURL file re-read only when it expires)"""
         if not self.curl_file.exists():
             print(f"❌ No auth file found: {self.curl_file}")
             print(f"\n📝 To create auth:")
@@ -51,41 +58,12 @@ class PermitPortalScraper:
             print(f"   5. Save to: {self.curl_file}")
             return False
         
-        with open(self.curl_file, 'r') as f:
-            curl_cmd = f.read()
-        
-        # Extract cookies from cURL
-        cookies = {}
-        headers = {}
-        
-        # Parse cURL format: curl 'URL' -H 'header: value' --cookie 'name=value'
-        lines = curl_cmd.split('\n')
-        for line in lines:
-            line = line.strip()
-            
-            # Extract cookies
-            if '--cookie' in line or '-b' in line:
-                cookie_str = line.split("'")[1] if "'" in line else line.split('"')[1]
-                for cookie in cookie_str.split(';'):
-                    if '=' in cookie:
-                        name, value = cookie.strip().split('=', 1)
-                        cookies[name] = value
-            
-            # Extract headers
-            if '-H' in line or '--header' in line:
-                try:
-                    header_str = line.split("'")[1] if "'" in line else line.split('"')[1]
-                    if ':' in header_str:
-                        name, value = header_str.split(':', 1)
-                        headers[name.strip()] = value.strip()
-                except:
-                    pass
-        
-        # Apply to session
-        self.session.cookies.update(cookies)
-        self.session.headers.update(headers)
+        # Reuses the saved session while it still probes as logged in
+        session = portal_sessions.get(self.city_name, self.curl_file, probe_url=self.probe_url)
+        if session is None:
+            return False
         
-        print(f"✅ Loaded {len(cookies)} cookies, {len(headers)} headers")
+        self.session = session
         return True
     
     def scrape(self):
@@ -99,14 +77,58 @@ class AccelaScraper(PermitPortalScraper):
     Common URLs:
     - Round Rock: https://permits.roundrocktexas.gov/
     - Plano: Uses Accela (need to find URL)
+    - Fort Worth: https://aca-prod.accela.com/CFW (module Development)
+    
+    With a module, search_url is the ACA agency root and the search is
+    replayed over plain HTTP postbacks (no login or browser needed).
     """
     
-    def __init__(self, city_name, search_url):
+    def __init__(self, city_name, search_url, module=None, days=30):
         super().__init__(city_name, "Accela")
         self.search_url = search_url
+        self.module = module
+        self.days = days
+    
+    def scrape_postbacks(self):
+        """Search the ACA module over HTTP postbacks, all result pages"""
+        print(f"🔍 Searching {self.city_name} Accela {self.module} (HTTP postbacks)...")
+        
+        permits = []
+        
+        try:
+            # Public ACA searches work anonymously; a saved session is used if there is one
+            if self.curl_file.exists():
+                self.load_auth_from_curl()
+            
+            portal = AccelaPortal(self.search_url, self.module, session=self.session)
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=self.days)
+            
+            for row in portal.search_results(start_date, end_date):
+                permits.append({
+                    'city': self.city_name,
+                    'permit_number': row['permit_number'],
+                    'address': row.get('address', ''),
+                    'permit_type': row.get('permit_type', ''),
+                    'date': row.get('issue_date', ''),
+                    'owner': row.get('owner', ''),
+                    'status': row.get('status', ''),
+                    'scraped_at': datetime.now().isoformat(),
+                    'source': 'Accela'
+                })
+            
+            print(f"   ✅ Found {len(permits)} permits")
+            
+        except Exception as e:
+            print(f"   ❌ Error scraping: {e}")
+        
+        return permits
     
     def scrape(self):
         """Scrape permits from Accela portal"""
+        if self.module:
+            return self.scrape_postbacks()
+        
         if not self.load_auth_from_curl():
             return []
         
@@ -239,6 +261,27 @@ class OpenGovScraper(PermitPortalScraper):
         self.dataset_url = dataset_url
         self.csv_direct = csv_direct
     
+    def find_csv_url(self):
+        """Find the CSV download link on the dataset page (reused while the page is unchanged)"""
+        response = validator_cache.get(self.dataset_url, 'opengov', session=self.session, timeout=15)
+        if validator_cache.not_modified(response):
+            return validator_cache.payload(self.dataset_url, 'opengov')
+        response.raise_for_status()
+        
+        # OpenGov usually has direct CSV download links
+        soup = BeautifulSoup(response.text, 'html.parser')
+        csv_links = soup.find_all('a', href=lambda x: x and '.csv' in x.lower())
+        
+        if not csv_links:
+            return None
+        
+        csv_url = csv_links[0]['href']
+        if not csv_url.startswith('http'):
+            csv_url = self.dataset_url.rsplit('/', 1)[0] + '/' + csv_url
+        
+        validator_cache.store(self.dataset_url, 'opengov', response, csv_url)
+        return csv_url
+    
     def scrape(self):
         """Download CSV from OpenGov portal"""
         print(f"🔍 Downloading {self.city_name} OpenGov CSV...")
@@ -251,73 +294,64 @@ class OpenGovScraper(PermitPortalScraper):
                 csv_url = self.csv_direct
                 print(f"   📥 Using direct CSV link...")
             else:
-                # OpenGov usually has direct CSV download links
-                response = self.session.get(self.dataset_url, timeout=15)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Find CSV download link
-                csv_links = soup.find_all('a', href=lambda x: x and '.csv' in x.lower())
-                
-                if not csv_links:
+                csv_url = self.find_csv_url()
+                if not csv_url:
                     print(f"   ⚠️  No CSV links found")
                     return []
-                
-                csv_url = csv_links[0]['href']
-                if not csv_url.startswith('http'):
-                    csv_url = self.dataset_url.rsplit('/', 1)[0] + '/' + csv_url
             
             print(f"   📥 Downloading: {csv_url}")
             
-            # Download CSV
-            csv_response = self.session.get(csv_url, timeout=30)
-            csv_response.raise_for_status()
-            
-            # Parse CSV
-            lines = csv_response.text.splitlines()
-            reader = csv.DictReader(lines)
-            
-            for row in reader:
-                # Map common CSV column names (case-insensitive search)
-                row_upper = {k.upper(): v for k, v in row.items()}
+            csv_response = validator_cache.get(csv_url, 'opengov', session=self.session, stream=True, timeout=30)
+            with csv_response:
+                if validator_cache.not_modified(csv_response):
+                    permits = validator_cache.payload(csv_url, 'opengov')
+                    print(f"   ♻️  CSV unchanged since last run, reusing {len(permits)} parsed permits")
+                    return permits
+                csv_response.raise_for_status()
                 
-                permit = {
-                    'city': self.city_name,
-                    'permit_number': (
-                        row.get('Permit Number') or row.get('PermitNumber') or 
-                        row.get('PERMIT_NUMBER') or row_upper.get('PERMIT #') or 
-                        row_upper.get('PERMIT NUMBER') or ''
-                    ),
-                    'address': (
-                        row.get('Address') or row.get('Location') or 
-                        row.get('ADDRESS') or row_upper.get('ADDRESS') or ''
-                    ),
-                    'permit_type': (
-                        row.get('Type') or row.get('Permit Type') or 
-                        row.get('PERMIT_TYPE') or row_upper.get('PERMIT TYPE') or 
-                        row_upper.get('WORK TYPE') or ''
-                    ),
-                    'date_submitted': (
-                        row.get('Date') or row.get('Issue Date') or 
-                        row.get('ISSUE_DATE') or row_upper.get('DATE SUBMITTED') or 
-                        row_upper.get('DATE ISSUED') or ''
-                    ),
-                    'date_issued': row_upper.get('DATE ISSUED') or '',
-                    'owner': (
-                        row.get('Owner') or row.get('Applicant') or 
-                        row_upper.get('PRIMARY CONTACT') or row_upper.get('PROJECT NAME') or ''
-                    ),
-                    'value': (
-                        row.get('Value') or row.get('Valuation') or 
-                        row_upper.get('DECLARED VALUATION') or ''
-                    ),
-                    'area_sf': row_upper.get('AREA (SF)') or '',
-                    'work_type': row_upper.get('WORK TYPE') or '',
-                    'scraped_at': datetime.now().isoformat(),
-                    'source': 'OpenGov CSV'
-                }
-                permits.append(permit)
+                # Stream the CSV row by row instead of holding the whole file in memory
+                for row in iter_csv_response(csv_response):
+                    # Map common CSV column names (case-insensitive search)
+                    row_upper = {k.upper(): v for k, v in row.items()}
+                    
+                    permit = {
+                        'city': self.city_name,
+                        'permit_number': (
+                            row.get('Permit Number') or row.get('PermitNumber') or 
+                            row.get('PERMIT_NUMBER') or row_upper.get('PERMIT #') or 
+                            row_upper.get('PERMIT NUMBER') or ''
+                        ),
+                        'address': (
+                            row.get('Address') or row.get('Location') or 
+                            row.get('ADDRESS') or row_upper.get('ADDRESS') or ''
+                        ),
+                        'permit_type': (
+                            row.get('Type') or row.get('Permit Type') or 
+                            row.get('PERMIT_TYPE') or row_upper.get('PERMIT TYPE') or 
+                            row_upper.get('WORK TYPE') or ''
+                        ),
+                        'date_submitted': (
+                            row.get('Date') or row.get('Issue Date') or 
+                            row.get('ISSUE_DATE') or row_upper.get('DATE SUBMITTED') or 
+                            row_upper.get('DATE ISSUED') or ''
+                        ),
+                        'date_issued': row_upper.get('DATE ISSUED') or '',
+                        'owner': (
+                            row.get('Owner') or row.get('Applicant') or 
+                            row_upper.get('PRIMARY CONTACT') or row_upper.get('PROJECT NAME') or ''
+                        ),
+                        'value': (
+                            row.get('Value') or row.get('Valuation') or 
+                            row_upper.get('DECLARED VALUATION') or ''
+                        ),
+                        'area_sf': row_upper.get('AREA (SF)') or '',
+                        'work_type': row_upper.get('WORK TYPE') or '',
+                        'scraped_at': datetime.now().isoformat(),
+                        'source': 'OpenGov CSV'
+                    }
+                    permits.append(permit)
+                
+            validator_cache.store(csv_url, 'opengov', csv_response, permits)
             
             print(f"   ✅ Found {len(permits)} permits from CSV")
             
@@ -359,6 +393,13 @@ CITY_CONFIGS = {
         'url': 'https://permits.roundrocktexas.gov/',
         'scraper_class': AccelaScraper
     },
+    'fortworth': {
+        'name': 'Fort Worth',
+        'vendor': 'Accela',
+        'url': 'https://aca-prod.accela.com/CFW',
+        'module': 'Development',
+        'scraper_class': AccelaScraper
+    },
     'murfreesboro': {
         'name': 'Murfreesboro',
         'vendor': 'CivicPlus',
@@ -425,10 +466,14 @@ def main():
     # Create scraper with optional csv_direct parameter
     if config['vendor'] == 'OpenGov' and 'csv_direct' in config:
         scraper = config['scraper_class'](args.city, config['url'], config.get('csv_direct'))
+    elif config['vendor'] == 'Accela' and 'module' in config:
+        scraper = config['scraper_class'](args.city, config['url'], config['module'])
     else:
         scraper = config['scraper_class'](args.city, config['url'])
     
     permits = scraper.scrape()
+    # Keep cookies the portal rotated during the scrape for the next run
+    portal_sessions.save(args.city)
     
     if permits:
         save_permits_to_csv(permits, args.city)
@@ -0,0 +1,38 @@
+"""
+Per-source high-watermarks for incremental scraping
+Remembers the newest record seen from each source so the next run
+only asks the upstream API for records newer than that
+"""
+import json
+import os
+from pathlib import Path
+
+# Stored next to the leads database so both move together
+WATERMARKS_PATH = Path(__file__).parent / 'leads_db' / 'watermarks.json'
+
+
+def load_watermarks():
+    """Load all source watermarks ({source: {field: value}})"""
+    try:
+        with open(WATERMARKS_PATH, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_watermarks(watermarks):
+    """Persist watermarks (write to temp file, then rename)"""
+    WATERMARKS_PATH.parent.mkdir(exist_ok=True)
+    tmp_path = WATERMARKS_PATH.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp_path, WATERMARKS_PATH)
+
+
+def is_newer(record_mark, watermark, fields):
+    """Compare two marks field by field (e.g. date first, then id tiebreaker)"""
+    if not watermark:
+        return True
+    record_key = tuple(record_mark.get(field) or 0 for field in fields)
+    watermark_key = tuple(watermark.get(field) or 0 for field in fields)
+    return record_key > watermark_key